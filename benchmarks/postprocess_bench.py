@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the post-processing stage
+Compares the fused in-place chain with the array-at-a-time version that
+text_to_speech used before, in time and peak allocated memory.
+
+    python benchmarks/postprocess_bench.py --minutes 10
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "kokoro_mv"))
+from postprocess import PostProcessor  # noqa: E402
+
+SAMPLE_RATE = 24000
+
+
+def legacy(samples: np.ndarray, volume: float = 1.0) -> np.ndarray:
+    """The post-processing text_to_speech did before the chain."""
+    max_val = np.max(np.abs(samples))
+    if max_val > 0:
+        samples = samples / max_val
+    samples = np.clip(samples * volume, -1.0, 1.0)
+    return (samples * 32767).astype("int16")
+
+
+def fused(samples: np.ndarray, volume: float = 1.0) -> np.ndarray:
+    return PostProcessor().process(samples, SAMPLE_RATE, volume)
+
+
+def measure(fn, source: np.ndarray, repeat: int):
+    """Best time and peak allocation beyond the input buffer over `repeat` runs."""
+    best, peak = float("inf"), 0
+    for _ in range(repeat):
+        samples = source.copy()
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn(samples, 0.8)
+        elapsed = time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = min(best, elapsed)
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the audio post-processing stage.")
+    parser.add_argument("--minutes", type=float, default=10.0, help="Length of the synthetic narration")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation")
+    args = parser.parse_args()
+
+    n = int(args.minutes * 60 * SAMPLE_RATE)
+    rng = np.random.default_rng(0)
+    source = (rng.standard_normal(n) * 0.2).astype(np.float32)
+
+    mismatch = np.max(np.abs(legacy(source.copy(), 0.8).astype(np.int32) - fused(source.copy(), 0.8)))
+    print(f"{args.minutes:g} min of 24 kHz audio ({source.nbytes / 2**20:.0f} MB float32), "
+          f"max difference {mismatch} LSB")
+    results = {name: measure(fn, source, args.repeat) for name, fn in (("legacy", legacy), ("fused", fused))}
+    for name, (elapsed, peak) in results.items():
+        print(f"{name:<8} {elapsed * 1000:8.1f} ms  peak allocations {peak / 2**20:8.1f} MB")
+    (t_old, m_old), (t_new, m_new) = results["legacy"], results["fused"]
+    print(f"fused is {t_old / t_new:.1f}x faster and allocates {m_old / max(m_new, 1):.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
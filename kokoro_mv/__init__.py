@@ -9,7 +9,13 @@ License: MIT
 Version: 0.1.2
 """
 
+from .backends import CacheBackend, HTTPBackend
 from .koko import KokoroService
+from .pool import SynthesisPool, configure_pool
+from .postprocess import Fade, Gain, LoudnessNormalize, PeakNormalize, PostProcessor, Stage, TrimSilence
+from .registry import ModelRegistry, evict_models
+from .server import SynthesisClient
+from .store import AudioStore
 
 __version__ = "0.1.5"
 __author__ = "Nadeem Akhtar Khan"
@@ -19,6 +25,21 @@ __description__ = "Professional library for generating high-quality voiceovers i
 
 __all__ = [
     'KokoroService',
+    'ModelRegistry',
+    'evict_models',
+    'SynthesisPool',
+    'configure_pool',
+    'CacheBackend',
+    'HTTPBackend',
+    'AudioStore',
+    'SynthesisClient',
+    'PostProcessor',
+    'Stage',
+    'PeakNormalize',
+    'LoudnessNormalize',
+    'Gain',
+    'TrimSilence',
+    'Fade',
     '__version__',
     '__author__',
     '__email__',
@@ -0,0 +1,121 @@
+"""
+Cache backends for Kokoro Manim Voiceover
+Shared stores that KokoroService consults on a local cache miss and uploads
+new voiceovers to, e.g. so render-farm nodes reuse each other's narration.
+"""
+
+import http.client
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class CacheBackend(ABC):
+    """A shared store of synthesized voiceovers, keyed by `KokoroService.get_data_hash`."""
+
+    @abstractmethod
+    def fetch(self, data_hash: str, dest: str) -> Optional[Dict[str, Any]]:
+        """
+        Write the stored audio for a hash to dest and return its cache entry, or
+        None on a miss. Raises OSError when the backend fails or answers with
+        something other than a cache entry.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, data_hash: str, audio_file: str, entry: Dict[str, Any]) -> None:
+        """Store the audio file and cache entry for a hash."""
+        raise NotImplementedError
+
+
+class HTTPBackend(CacheBackend):
+    """
+    Stores voiceovers on an HTTP server with plain GET and PUT requests.
+
+    For a hash `h`, the audio lives at `{base_url}/{h}{ext}` and the cache
+    entry at `{base_url}/{h}.json`. The entry is uploaded after the audio, so
+    a present entry always means complete audio. Any server that accepts PUT
+    (nginx with WebDAV, a bucket behind a proxy, a small test server) works.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30.0, headers: Optional[Dict[str, str]] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+
+    def _request(self, url: str, method: str = "GET", data: Optional[bytes] = None,
+                 content_type: Optional[str] = None):
+        headers = dict(self.headers)
+        if content_type:
+            headers["Content-Type"] = content_type
+        request = urllib.request.Request(url, data=data, method=method, headers=headers)
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def fetch(self, data_hash: str, dest: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._request(f"{self.base_url}/{data_hash}.json") as response:
+                entry = json.loads(response.read().decode("utf-8"))
+            if not isinstance(entry, dict) or not isinstance(entry.get("original_audio"), str):
+                raise ValueError("not a cache entry")
+            suffix = Path(entry["original_audio"]).suffix
+            dest = Path(dest)
+            tmp = dest.parent / f".{dest.name}.{uuid.uuid4().hex}.tmp"
+            try:
+                with self._request(f"{self.base_url}/{data_hash}{suffix}") as response, open(tmp, "wb") as f:
+                    received = 0
+                    for block in iter(lambda: response.read(1 << 16), b""):
+                        f.write(block)
+                        received += len(block)
+                    # read(n) returns what arrived when the connection drops instead of raising
+                    expected = response.headers.get("Content-Length")
+                    if expected is not None and received != int(expected):
+                        raise http.client.IncompleteRead(b"", int(expected) - received)
+                os.replace(tmp, dest)
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+            return entry
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise OSError(f"Cache server returned {e.code} for {data_hash}") from e
+        except urllib.error.URLError as e:
+            raise OSError(f"Cache server unreachable: {e.reason}") from e
+        except (ValueError, http.client.HTTPException) as e:
+            raise OSError(f"Cache server sent a malformed response for {data_hash}: {e!r}") from e
+
+    def put(self, data_hash: str, audio_file: str, entry: Dict[str, Any]) -> None:
+        suffix = Path(audio_file).suffix
+        with open(audio_file, "rb") as f:
+            self._request(f"{self.base_url}/{data_hash}{suffix}", "PUT", f.read(),
+                          "application/octet-stream").close()
+        self._request(f"{self.base_url}/{data_hash}.json", "PUT", json.dumps(entry).encode("utf-8"),
+                      "application/json").close()
+
+
+_uploader: Optional[ThreadPoolExecutor] = None
+_uploader_lock = threading.Lock()
+
+
+def upload_in_background(backend: CacheBackend, data_hash: str, audio_file: str,
+                         entry: Dict[str, Any]) -> Future:
+    """Queue `backend.put` on the upload thread; failures are reported, not raised."""
+    global _uploader
+    with _uploader_lock:
+        if _uploader is None:
+            _uploader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kokoro-upload")
+
+    def upload():
+        try:
+            backend.put(data_hash, audio_file, entry)
+        except Exception as e:
+            print(f"⚠️  Could not upload voiceover {data_hash[:12]} to {type(backend).__name__}: {e}")
+
+    return _uploader.submit(upload)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Batch synthesis for Kokoro Manim Voiceover
+Synthesizes a JSONL/CSV manifest of narrations into a voiceover cache on a pool
+of worker processes (kokoro-mv-batch), so later renders are pure cache hits.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List
+
+from tqdm import tqdm
+
+from .batching import MAX_BATCH
+from .prefetch import CONFIG_DEFAULTS
+from .runtime import auto_threads, available_cores
+from .setup import ensure_model_files
+
+# Manifest columns besides the text
+MANIFEST_KEYS = ("voice", "lang", "speed", "volume")
+
+
+def read_manifest(path: str) -> List[Dict[str, Any]]:
+    """
+    Read the narrations of a manifest. `.csv` files need a header row with a
+    `text` column; anything else is read as JSONL, one object per line.
+    Missing voice, lang, speed and volume fall back to the KokoroService defaults.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            records = list(csv.DictReader(f))
+        else:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    rows = []
+    for number, record in enumerate(records, 1):
+        text = " ".join(str(record.get("text") or "").split())
+        if not text:
+            print(f"⚠️  Skipping manifest row {number}: no text")
+            continue
+        row = {"text": text}
+        for key in MANIFEST_KEYS:
+            value = record.get(key)
+            row[key] = CONFIG_DEFAULTS[key] if value in (None, "") else value
+        row["speed"] = float(row["speed"])
+        row["volume"] = float(row["volume"])
+        rows.append(row)
+    return rows
+
+
+# Per-process state of a batch worker
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(cache_dir: str, options: Dict[str, Any]) -> None:
+    """Set up a worker process; its services share one loaded model through the registry."""
+    _worker["cache_dir"] = cache_dir
+    _worker["options"] = options
+    _worker["services"] = {}
+
+
+def _service(row: Dict[str, Any]):
+    from .koko import KokoroService
+
+    key = tuple(row[k] for k in MANIFEST_KEYS)
+    service = _worker["services"].get(key)
+    if service is None:
+        service = KokoroService(cache_dir=_worker["cache_dir"], **_worker["options"],
+                                **{k: row[k] for k in MANIFEST_KEYS})
+        _worker["services"][key] = service
+    return service
+
+
+def _synthesize_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Worker job: synthesize narrations of one config together and return their cache entries and durations."""
+    from .encoding import get_duration
+
+    service = _service(rows[0])
+    entries = service.synthesize_batch([row["text"] for row in rows], cache_dir=service.cache_dir)
+    return [{"entry": json_dict, "duration": get_duration(str(Path(service.cache_dir) / json_dict["original_audio"]))}
+            for json_dict in entries]
+
+
+def group_rows(rows: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]:
+    """Split rows into groups of at most `size` sharing voice, lang, speed and volume."""
+    by_config: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_config.setdefault(tuple(row[k] for k in MANIFEST_KEYS), []).append(row)
+    return [same[start:start + size] for same in by_config.values() for start in range(0, len(same), size)]
+
+
+def pending_rows(rows: List[Dict[str, Any]], cache_dir: str, output_format: str = "mp3",
+                 precision: str = "fp32") -> List[Dict[str, Any]]:
+    """Drop the rows whose voiceover is already cached, so interrupted batches resume."""
+    from .cache import build_input_data, hash_input_data, open_index
+
+    index = open_index(cache_dir)
+    index.import_json()
+    pending, seen = [], set()
+    for row in rows:
+        data_hash = hash_input_data(build_input_data(row["text"], row["voice"], row["lang"], row["volume"],
+                                                     output_format, precision, speed=row["speed"]))
+        if data_hash in seen or index.lookup(data_hash) is not None:
+            continue
+        seen.add(data_hash)
+        pending.append(row)
+    return pending
+
+
+def run_batch(manifest: str, cache_dir: str, workers: int = None, output_format: str = "mp3",
+              model_path: str = "", voices_path: str = "", precision: str = "fp32") -> int:
+    """
+    Synthesize every uncached narration of a manifest into cache_dir.
+
+    Returns:
+        int: The number of narrations that failed.
+    """
+    from manim_voiceover.defaults import DEFAULT_VOICEOVER_CACHE_JSON_FILENAME
+    from manim_voiceover.helper import append_to_json_file
+
+    workers = workers or max(1, available_cores() // 2)
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+    rows = read_manifest(manifest)
+    pending = pending_rows(rows, cache_dir, output_format, precision)
+    print(f"📋 {len(rows)} narrations, {len(rows) - len(pending)} already cached, {len(pending)} to synthesize")
+    if not pending:
+        return 0
+
+    # Download the model once here; workers downloading it side by side could load a partial file
+    model_path, voices_path = (os.path.abspath(path) for path in ensure_model_files(precision, model_path, voices_path))
+
+    # Split the cores between the workers instead of every session using all of them
+    options = {
+        "output_format": output_format,
+        "precision": precision,
+        "model_path": model_path,
+        "voices_path": voices_path,
+        "chunk_workers": 1,
+        "intra_op_threads": auto_threads(workers),
+    }
+    json_path = Path(cache_dir) / DEFAULT_VOICEOVER_CACHE_JSON_FILENAME
+    failed = 0
+    audio_seconds = 0.0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(cache_dir), options)) as executor:
+        # Narrations of a group share padded batches through the model
+        futures = {executor.submit(_synthesize_rows, group): group for group in group_rows(pending, MAX_BATCH)}
+        with tqdm(total=len(pending), unit="narration", desc="🎤 Synthesizing") as progress:
+            for future in as_completed(futures):
+                group = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    failed += len(group)
+                    tqdm.write(f"❌ {group[0]['text'][:60]} (+{len(group) - 1} more): {e}")
+                else:
+                    for result in results:
+                        # Only this process writes cache.json; workers record in the index
+                        entry = dict(result["entry"])
+                        entry["final_audio"] = entry["original_audio"]
+                        append_to_json_file(json_path, entry)
+                        audio_seconds += result["duration"]
+                    elapsed = time.perf_counter() - start
+                    progress.set_postfix(audio=f"{audio_seconds:.0f}s", speed=f"{audio_seconds / elapsed:.1f}x")
+                progress.update(len(group))
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(pending) - failed} narrations, {audio_seconds:.1f}s of audio in {elapsed:.1f}s "
+          f"({audio_seconds / elapsed:.1f}x realtime) with {workers} workers")
+    if failed:
+        print(f"⚠️  {failed} narrations failed; run the batch again to retry them.")
+    return failed
+
+
+def main():
+    """Main function for the batch synthesis script."""
+    parser = argparse.ArgumentParser(
+        prog="kokoro-mv-batch",
+        description="Synthesize a JSONL/CSV manifest of narrations into the voiceover cache.",
+    )
+    parser.add_argument("manifest", help="JSONL or CSV file with text, voice, lang, speed and volume")
+    parser.add_argument("--cache-dir", default=str(Path("media") / "voiceovers"),
+                        help="Voiceover cache directory (default: media/voiceovers)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: half the cores)")
+    parser.add_argument("--format", dest="output_format", default="mp3", help="mp3, wav, flac or opus")
+    parser.add_argument("--precision", default=os.getenv("KOKORO_MV_PRECISION") or "fp32",
+                        help="Model variant: fp32, fp16 or int8")
+    parser.add_argument("--model-path", default="", help="Path to kokoro-v1.0.onnx")
+    parser.add_argument("--voices-path", default="", help="Path to voices-v1.0.bin")
+    args = parser.parse_args()
+
+    try:
+        failed = run_batch(args.manifest, args.cache_dir, args.workers, args.output_format,
+                           args.model_path, args.voices_path, args.precision)
+    except KeyboardInterrupt:
+        print(f"\n\n⏹️  Batch interrupted; finished narrations are cached and will be skipped next time.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Batch failed: {e}")
+        sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Batched inference for Kokoro Manim Voiceover
+Groups chunks of similar phoneme length into padded batches, so many short
+utterances go through the ONNX session in a few calls instead of one each.
+"""
+
+import threading
+import weakref
+from typing import List, Sequence
+
+import numpy as np
+
+from .chunking import CLAUSE_PAUSE, SENTENCE_PAUSE
+
+# Kokoro's output sample rate (kokoro_onnx.config.SAMPLE_RATE)
+SAMPLE_RATE = 24000
+# Most chunks a padded batch holds
+MAX_BATCH = 8
+# Longest over shortest phoneme count allowed in a batch. Padding tokens are
+# not masked out by the model, so buckets stay tight to keep them few.
+LENGTH_TOLERANCE = 1.25
+
+_TENSOR_TYPES = {
+    "tensor(float)": np.float32,
+    "tensor(float16)": np.float16,
+    "tensor(double)": np.float64,
+    "tensor(int32)": np.int32,
+    "tensor(int64)": np.int64,
+}
+
+
+def bucket_by_length(lengths: Sequence[int], max_batch: int = MAX_BATCH,
+                     tolerance: float = LENGTH_TOLERANCE) -> List[List[int]]:
+    """Group indices into buckets of similar length, shortest first."""
+    buckets, current = [], []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        if current and (len(current) >= max_batch or lengths[i] > lengths[current[0]] * tolerance):
+            buckets.append(current)
+            current = []
+        current.append(i)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def create_timed(kokoro, phonemes: str, voice_name: str, speed: float, lang: str = "en-us"):
+    """
+    Synthesize phonemes and return (samples, phoneme timings). The timings are
+    None with models (or kokoro_onnx versions) that don't report durations.
+    """
+    if getattr(kokoro, "has_timings", False):
+        audio, _, timings = kokoro.create_timed(phonemes, voice=voice_name, speed=speed, lang=lang, is_phonemes=True)
+        return audio, timings
+    return kokoro.create(phonemes, voice=voice_name, speed=speed, lang=lang, is_phonemes=True)[0], None
+
+
+class BatchedInference:
+    """
+    Runs padded batches through a loaded Kokoro model's ONNX session.
+
+    Splitting a padded batch back into utterances needs the per-token frame
+    durations, so batching is only used with exports that output them and
+    accept a batch dimension. Everything else, and any batch the session
+    rejects, is synthesized one utterance at a time.
+    """
+
+    def __init__(self, kokoro):
+        self.kokoro = kokoro
+        session = kokoro.sess
+        inputs = {i.name: i for i in session.get_inputs()}
+        self.tokens_input = "input_ids" if "input_ids" in inputs else "tokens"
+        self.dtypes = {name: _TENSOR_TYPES.get(i.type, np.float32) for name, i in inputs.items()}
+        self.speed_batched = inputs["speed"].shape[0] != 1
+        outputs = [o.name for o in session.get_outputs()]
+        self.duration_output = outputs.index("duration") if "duration" in outputs else None
+        self.supported = self.duration_output is not None and inputs[self.tokens_input].shape[0] != 1
+
+    def _style(self, voice: np.ndarray, length: int) -> np.ndarray:
+        # One style vector per phoneme count
+        return np.asarray(voice[min(length, len(voice)) - 1], dtype=self.dtypes["style"]).reshape(1, -1)
+
+    def _run(self, token_lists: List[List[int]], voice: np.ndarray, speed: float):
+        width = max(len(tokens) for tokens in token_lists) + 2
+        # Token 0 is Kokoro's boundary token and doubles as padding
+        ids = np.zeros((len(token_lists), width), dtype=self.dtypes[self.tokens_input])
+        for row, tokens in enumerate(token_lists):
+            ids[row, 1:len(tokens) + 1] = tokens
+        speeds = np.full(len(token_lists) if self.speed_batched else 1, speed, dtype=self.dtypes["speed"])
+        inputs = {
+            self.tokens_input: ids,
+            "style": np.concatenate([self._style(voice, len(tokens)) for tokens in token_lists]),
+            "speed": speeds,
+        }
+        return self.kokoro.sess.run(None, inputs)
+
+    def _batch(self, token_lists: List[List[int]], phonemes: List[str], voice: np.ndarray, speed: float):
+        from kokoro_onnx.sliding import timings, token_edges
+        from kokoro_onnx.trim import trim
+        try:
+            from kokoro_onnx.pauses import insert as insert_pauses
+        except ImportError:
+            insert_pauses = None
+
+        outputs = self._run(token_lists, voice, speed)
+        audio = np.asarray(outputs[0], dtype=np.float32)
+        durations = np.asarray(outputs[self.duration_output])
+        if audio.ndim != 2 or audio.shape[0] != len(token_lists) or durations.shape[0] != len(token_lists):
+            raise ValueError(f"unexpected batch output shapes {audio.shape} and {durations.shape}")
+        # The longest row fills the output, which fixes the samples per frame
+        samples_per_frame = audio.shape[1] / durations.sum(axis=1).max()
+        results = []
+        for row, tokens in enumerate(token_lists):
+            duration = durations[row, :len(tokens) + 2]
+            length = int(round(duration.sum() * samples_per_frame))
+            trimmed, (head, _) = trim(audio[row, :length])
+            # Drop the leading pad boundary so index i is where phoneme i starts, as Kokoro.create_timed does
+            edges = np.clip(token_edges(duration, length)[1:] - head, 0, len(trimmed))
+            spoken = timings(self.kokoro.tokenizer.known(phonemes[row]), edges, SAMPLE_RATE)
+            if insert_pauses is not None:
+                # Lengthen the pauses after the marks inside the utterance, as create_timed does
+                trimmed, spoken = insert_pauses(trimmed, spoken, SAMPLE_RATE, SENTENCE_PAUSE, CLAUSE_PAUSE)
+            results.append((trimmed, spoken))
+        return results
+
+    def synthesize(self, phonemes: List[str], voice_name: str, speed: float) -> List[np.ndarray]:
+        """Synthesize phoneme strings of one voice and speed, in order, trimmed like `Kokoro.create`."""
+        return [audio for audio, _ in self.synthesize_timed(phonemes, voice_name, speed)]
+
+    def synthesize_timed(self, phonemes: List[str], voice_name: str, speed: float) -> List[tuple]:
+        """`synthesize` that also returns the phoneme timings of every utterance, like `Kokoro.create_timed`."""
+        if self.supported and len(phonemes) > 1:
+            token_lists = [self.kokoro.tokenizer.tokenize(p) for p in phonemes]
+            if all(token_lists):
+                try:
+                    return self._batch(token_lists, phonemes, self.kokoro.get_voice_style(voice_name), speed)
+                except Exception as e:
+                    self.supported = False
+                    print(f"⚠️  Batched inference failed for this model ({e}); synthesizing one chunk at a time")
+        return [create_timed(self.kokoro, p, voice_name, speed) for p in phonemes]
+
+
+_inference = weakref.WeakKeyDictionary()
+_inference_lock = threading.Lock()
+
+
+def batched_inference(kokoro) -> BatchedInference:
+    """The batched inference wrapper of a loaded model, created on first use."""
+    with _inference_lock:
+        inference = _inference.get(kokoro)
+        if inference is None:
+            inference = _inference[kokoro] = BatchedInference(kokoro)
+        return inference
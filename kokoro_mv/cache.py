@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Voiceover cache index for Kokoro Manim Voiceover
+An SQLite index over a voiceover cache directory with O(1) hash lookups,
+an optional size cap with LRU eviction, and the kokoro-mv-cache maintenance CLI.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .locking import is_locked, remove_stale_locks
+from .segments import SegmentCache
+
+INDEX_FILENAME = "kokoro_cache.sqlite"
+# manim_voiceover's JSON cache file (manim_voiceover.defaults.DEFAULT_VOICEOVER_CACHE_JSON_FILENAME)
+JSON_FILENAME = "cache.json"
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".flac", ".opus")
+# Temporary files younger than this (seconds) may belong to a write in progress
+_TMP_MIN_AGE = 3600
+# Bytes before the last imported cache.json entry that must be unchanged for an incremental import
+_CHECK_BYTES = 256
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024 ** 2, "MB": 1024 ** 2,
+               "G": 1024 ** 3, "GB": 1024 ** 3, "T": 1024 ** 4, "TB": 1024 ** 4}
+
+
+def parse_size(size: Union[int, str, None]) -> Optional[int]:
+    """Parse a byte count such as 500000, "750MB" or "2GB"."""
+    if size is None or isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*([\d.]+)\s*([A-Za-z]*)\s*", str(size))
+    if not match or match.group(2).upper() not in _SIZE_UNITS:
+        raise ValueError(f"Invalid size: {size!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(size: int) -> str:
+    """Format a byte count for humans."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+def build_input_data(text: str, voice: str, lang: str, volume: float, output_format: str = "mp3",
+                     precision: str = "fp32", post_processing: str = None, speed: float = 1.0) -> dict:
+    """The cache lookup data of a kokoro_self narration."""
+    input_data = {"input_text": text, "service": "kokoro_self", "voice": voice, "lang": lang, "volume": volume}
+    # Speed 1.0, MP3 and fp32 entries keep their original key so existing caches stay valid
+    if float(speed) != 1.0:
+        input_data["speed"] = float(speed)
+    if output_format != "mp3":
+        input_data["format"] = output_format
+    if precision != "fp32":
+        input_data["precision"] = precision
+    if post_processing is not None:
+        input_data["post_processing"] = post_processing
+    return input_data
+
+
+def hash_input_data(input_data: dict) -> str:
+    """SHA-256 of the input data dictionary, serialized with sorted keys."""
+    data_str = json.dumps(input_data, sort_keys=True)
+    return hashlib.sha256(data_str.encode('utf-8')).hexdigest()
+
+
+class CacheIndex:
+    """
+    SQLite index of the voiceover entries in one cache directory.
+
+    Entries are keyed by `hash_input_data(input_data)`. manim_voiceover
+    cache.json entries are imported when the JSON file changes, parsing only
+    the entries appended since the last import, so lookups never scan it.
+    """
+
+    def __init__(self, cache_dir: str, max_size: Union[int, str, None] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = parse_size(max_size)
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.cache_dir / INDEX_FILENAME), timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " hash TEXT PRIMARY KEY, audio TEXT NOT NULL, entry TEXT NOT NULL,"
+            " size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);"
+            "CREATE TABLE IF NOT EXISTS segments ("
+            " key TEXT PRIMARY KEY, size INTEGER NOT NULL, last_used REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS segments_last_used ON segments (last_used);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        self._db.commit()
+        self.segments = SegmentCache(self.cache_dir / "segments")
+        if self._meta("segments_indexed") is None:
+            self._index_segments()
+
+    def _index_segments(self) -> None:
+        """Index the sentence segments stored before the index tracked them, as used now."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO segments (key, size, last_used) VALUES (?, ?, ?)",
+                ((key, size, now) for key, size in self.segments.sizes().items()),
+            )
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('segments_indexed', '1')")
+            self._db.commit()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def import_json(self, force: bool = False) -> int:
+        """
+        Index the entries of manim_voiceover's cache.json if it changed since the last import.
+
+        manim_voiceover rewrites the file with one more entry on every voiceover
+        block, keeping the entries before it byte for byte, so only the entries
+        after the last imported one are parsed. The whole file is read again when
+        it was rewritten differently (e.g. by `compact`).
+
+        Parameters:
+            force (bool): Import the whole file, even if it looks unchanged.
+
+        Returns:
+            int: The number of entries added.
+        """
+        json_path = self.cache_dir / JSON_FILENAME
+        try:
+            stat = json_path.stat()
+        except FileNotFoundError:
+            return 0
+        signature = f"{stat.st_mtime_ns}:{stat.st_size}"
+        with self._lock:
+            if not force and self._meta("json_signature") == signature:
+                return 0
+            offset, check = (None, None) if force else (self._meta("json_offset"), self._meta("json_check"))
+            try:
+                with open(json_path, "rb") as f:
+                    entries, offset, check = _read_json_entries(f, int(offset) if offset else None, check)
+            except (OSError, ValueError):
+                return 0
+            added = 0
+            now = time.time()
+            for entry in entries:
+                if not isinstance(entry, dict) or entry.get("input_data", {}).get("service") != "kokoro_self":
+                    continue
+                audio = self.cache_dir / entry.get("original_audio", "")
+                if not audio.is_file():
+                    continue
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO entries (hash, audio, entry, size, created, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (hash_input_data(entry["input_data"]), entry["original_audio"], json.dumps(entry),
+                     audio.stat().st_size, now, now),
+                )
+                added += cursor.rowcount
+            self._db.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (("json_signature", signature), ("json_offset", str(offset)), ("json_check", check)),
+            )
+            self._db.commit()
+            return added
+
+    def lookup(self, data_hash: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached entry for a hash and mark it as recently used."""
+        with self._lock:
+            row = self._db.execute("SELECT audio, entry FROM entries WHERE hash = ?", (data_hash,)).fetchone()
+            if row is None:
+                return None
+            if not (self.cache_dir / row[0]).is_file():
+                # The audio was removed behind our back
+                self._db.execute("DELETE FROM entries WHERE hash = ?", (data_hash,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET last_used = ? WHERE hash = ?", (time.time(), data_hash))
+            self._db.commit()
+            return json.loads(row[1])
+
+    def record(self, data_hash: str, entry: Dict[str, Any]) -> None:
+        """Index a freshly synthesized entry and enforce the size cap."""
+        audio = self.cache_dir / entry["original_audio"]
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (hash, audio, entry, size, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (data_hash, entry["original_audio"], json.dumps(entry), audio.stat().st_size, now, now),
+            )
+            self._db.commit()
+        if self.max_size is not None:
+            self.evict(self.max_size)
+
+    def record_segment(self, key: str, size: int) -> None:
+        """Index a freshly stored sentence segment and enforce the size cap."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO segments (key, size, last_used) VALUES (?, ?, ?)",
+                             (key, size, time.time()))
+            self._db.commit()
+        if self.max_size is not None:
+            self.evict(self.max_size)
+
+    def touch_segments(self, keys: Iterable[str]) -> None:
+        """Mark sentence segments as recently used."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany("UPDATE segments SET last_used = ? WHERE key = ?", ((now, key) for key in keys))
+            self._db.commit()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Every indexed entry, without marking any as used."""
+        with self._lock:
+            return [json.loads(row[0]) for row in self._db.execute("SELECT entry FROM entries")]
+
+    def _total_size(self) -> int:
+        return self._db.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM entries) + (SELECT COALESCE(SUM(size), 0) FROM segments)"
+        ).fetchone()[0]
+
+    def total_size(self) -> int:
+        """Bytes taken by the indexed voiceovers and sentence segments."""
+        with self._lock:
+            return self._total_size()
+
+    def evict(self, max_size: int) -> int:
+        """
+        Delete least recently used voiceovers and sentence segments until the
+        index fits in max_size bytes.
+
+        Returns:
+            int: The number of bytes freed.
+        """
+        freed = 0
+        with self._lock:
+            total = self._total_size()
+            if total <= max_size:
+                return 0
+            rows = self._db.execute(
+                "SELECT hash, audio, size, last_used FROM entries"
+                " UNION ALL SELECT key, NULL, size, last_used FROM segments ORDER BY last_used"
+            ).fetchall()
+            for key, audio, size, _ in rows:
+                if total - freed <= max_size:
+                    break
+                if audio is None:
+                    self.segments.remove(key)
+                    self._db.execute("DELETE FROM segments WHERE key = ?", (key,))
+                    freed += size
+                    continue
+                for path in (self.cache_dir / audio, self.cache_dir / (Path(audio).stem + "_adjusted" + Path(audio).suffix)):
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+                self._db.execute("DELETE FROM entries WHERE hash = ?", (key,))
+                freed += size
+            self._db.commit()
+        return freed
+
+    def referenced_files(self) -> set:
+        """Audio files referenced by the index or by cache.json."""
+        with self._lock:
+            files = {row[0] for row in self._db.execute("SELECT audio FROM entries")}
+        json_path = self.cache_dir / JSON_FILENAME
+        if json_path.exists():
+            try:
+                with open(json_path, "r") as f:
+                    for entry in json.load(f):
+                        files.update(entry.get(k) for k in ("original_audio", "final_audio") if entry.get(k))
+            except (OSError, ValueError):
+                pass
+        return files
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize the cache directory."""
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        referenced = self.referenced_files()
+        orphans = [p for p in self.cache_dir.iterdir() if _is_prunable(p, referenced)]
+        segments_dir = self.segments.directory
+        segments = [p for p in segments_dir.rglob("*.npy")] if segments_dir.exists() else []
+        return {
+            "entries": entries,
+            "size": size,
+            "max_size": self.max_size,
+            "orphans": len(orphans),
+            "orphan_size": sum(p.stat().st_size for p in orphans),
+            "segments": len(segments),
+            "segment_size": sum(p.stat().st_size for p in segments_dir.rglob("*") if p.is_file()) if segments else 0,
+        }
+
+    def prune(self, segments: bool = False, dry_run: bool = False) -> int:
+        """
+        Delete audio files no cache entry references, leftover WAVs, temporary
+        files at least an hour old that no running synthesis holds, and the
+        lock files of voiceovers no one is synthesizing.
+
+        Parameters:
+            segments (bool): Also drop the sentence segment cache.
+            dry_run (bool): Only report what would be deleted.
+
+        Returns:
+            int: The number of bytes freed.
+        """
+        referenced = self.referenced_files()
+        freed = 0
+        for path in self.cache_dir.iterdir():
+            if _is_prunable(path, referenced):
+                freed += path.stat().st_size
+                if not dry_run:
+                    path.unlink()
+        remove_stale_locks(self.cache_dir, dry_run)
+        segments_dir = self.segments.directory
+        if segments and segments_dir.exists():
+            freed += sum(p.stat().st_size for p in segments_dir.rglob("*") if p.is_file())
+            if not dry_run:
+                shutil.rmtree(segments_dir)
+                with self._lock:
+                    self._db.execute("DELETE FROM segments")
+                    self._db.commit()
+        return freed
+
+    def compact(self) -> int:
+        """
+        Rewrite cache.json without duplicate or dangling entries and vacuum the index.
+
+        Returns:
+            int: The number of JSON entries dropped.
+        """
+        dropped = 0
+        json_path = self.cache_dir / JSON_FILENAME
+        if json_path.exists():
+            with open(json_path, "r") as f:
+                entries = json.load(f)
+            kept, seen = [], set()
+            for entry in entries:
+                key = json.dumps(entry.get("input_data"), sort_keys=True)
+                if key in seen or not (self.cache_dir / entry.get("final_audio", entry.get("original_audio", ""))).is_file():
+                    continue
+                seen.add(key)
+                kept.append(entry)
+            dropped = len(entries) - len(kept)
+            tmp_path = json_path.with_name(f".{json_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(kept, f, indent=2)
+            os.replace(tmp_path, json_path)
+        with self._lock:
+            self._db.execute("VACUUM")
+        return dropped
+
+
+def _tail_check(data: bytes) -> str:
+    """Fingerprint of the bytes before an import offset, to tell an append from a rewrite."""
+    return hashlib.sha256(data[-_CHECK_BYTES:]).hexdigest()
+
+
+def _read_json_entries(f, offset: Optional[int] = None, check: Optional[str] = None):
+    """
+    Entries of a JSON list file after `offset`, the end of the last entry read
+    before, whose preceding bytes have the fingerprint `check`. Reads the whole
+    list when offset is None or the file no longer matches.
+
+    Returns:
+        tuple: (entries, offset after the last entry, its fingerprint)
+    """
+    if offset is not None:
+        f.seek(max(0, offset - _CHECK_BYTES))
+        if _tail_check(f.read(offset - max(0, offset - _CHECK_BYTES))) != check:
+            offset = None
+    if offset is None:
+        f.seek(0)
+        data = f.read()
+        text = data.decode("utf-8")
+        if not isinstance(json.loads(text), list):
+            raise ValueError("cache.json is not a list")
+        # Entries are read back from after the opening bracket
+        start = text.index("[") + 1
+        base = 0
+    else:
+        data = f.read()
+        text = data.decode("utf-8")
+        start = 0
+        base = offset
+
+    decoder = json.JSONDecoder()
+    entries = []
+    position = start
+    end = start
+    while True:
+        while position < len(text) and text[position] in " \t\r\n,":
+            position += 1
+        if position >= len(text):
+            raise ValueError("cache.json ends inside the list")
+        if text[position] == "]":
+            break
+        entry, position = decoder.raw_decode(text, position)
+        entries.append(entry)
+        end = position
+    end_bytes = base + len(text[:end].encode("utf-8"))
+    if offset is None:
+        prefix = data[:end_bytes]
+    else:
+        f.seek(max(0, end_bytes - _CHECK_BYTES))
+        prefix = f.read(end_bytes - max(0, end_bytes - _CHECK_BYTES))
+    return entries, end_bytes, _tail_check(prefix)
+
+
+def _is_prunable(path: Path, referenced: set) -> bool:
+    if not path.is_file():
+        return False
+    if path.name.endswith(".tmp"):
+        return _is_stale_temp(path)
+    return path.suffix.lower() in AUDIO_EXTENSIONS and path.name not in referenced
+
+
+def _is_stale_temp(path: Path) -> bool:
+    """Whether a temporary file is old and no one is synthesizing the voiceover it is named after."""
+    if time.time() - path.stat().st_mtime < _TMP_MIN_AGE:
+        return False
+    # Temporary audio is named ".<hash><ext>.<id>.tmp", and written under that voiceover's lock
+    data_hash = path.name.lstrip(".").split(".")[0]
+    return not is_locked(path.parent / ".locks" / f"{data_hash}.lock")
+
+
+_indexes: Dict[str, CacheIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def open_index(cache_dir: str, max_size: Union[int, str, None] = None) -> CacheIndex:
+    """Return the process-wide index for a cache directory, opening it on first use."""
+    key = os.path.realpath(cache_dir)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = CacheIndex(cache_dir, max_size)
+        elif max_size is not None:
+            index.max_size = parse_size(max_size)
+        return index
+
+
+def main():
+    """Main function for the cache maintenance script."""
+    parser = argparse.ArgumentParser(prog="kokoro-mv-cache", description="Inspect and maintain a voiceover cache.")
+    parser.add_argument("--cache-dir", default=os.path.join("media", "voiceovers"),
+                        help="Voiceover cache directory (default: media/voiceovers)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show cache size and orphaned files")
+    prune = commands.add_parser("prune", help="Delete unreferenced audio and temporary files")
+    prune.add_argument("--segments", action="store_true", help="Also drop the sentence segment cache")
+    prune.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    evict = commands.add_parser("evict", help="Delete least recently used entries down to a size")
+    evict.add_argument("max_size", help="Target size, e.g. 500MB or 2GB")
+    commands.add_parser("compact", help="Deduplicate cache.json and vacuum the index")
+    args = parser.parse_args()
+
+    try:
+        if not Path(args.cache_dir).is_dir():
+            print(f"❌ No cache directory at {args.cache_dir}")
+            sys.exit(1)
+        index = CacheIndex(args.cache_dir)
+        index.import_json()
+
+        if args.command == "stats":
+            stats = index.stats()
+            print(f"📦 {stats['entries']} entries, {format_size(stats['size'])}")
+            print(f"🧩 {stats['segments']} sentence segments, {format_size(stats['segment_size'])}")
+            print(f"🗑️  {stats['orphans']} unreferenced files, {format_size(stats['orphan_size'])}")
+        elif args.command == "prune":
+            freed = index.prune(segments=args.segments, dry_run=args.dry_run)
+            verb = "Would free" if args.dry_run else "Freed"
+            print(f"✅ {verb} {format_size(freed)}")
+        elif args.command == "evict":
+            freed = index.evict(parse_size(args.max_size))
+            print(f"✅ Freed {format_size(freed)}")
+        elif args.command == "compact":
+            dropped = index.compact()
+            print(f"✅ Dropped {dropped} duplicate or dangling cache.json entries")
+    except KeyboardInterrupt:
+        print(f"\n\n⏹️  Interrupted by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Cache command failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Text chunking for Kokoro Manim Voiceover
+Splits narration at sentence and clause boundaries so every chunk fits in one
+model call, and stitches the synthesized chunks back together.
+"""
+
+import re
+from typing import Callable, Iterable, Iterator, List, NamedTuple
+
+import numpy as np
+
+
+# Kokoro's context length in phonemes (kokoro_onnx.config.MAX_PHONEME_LENGTH)
+MAX_PHONEMES = 510
+
+_CJK_LANGS = ("cmn", "zh", "yue", "ja")
+
+_SENTENCE_END = {
+    "default": r"[.!?…]+[\"'”’)\]]*(?=\s|$)",
+    "hi": r"[।॥.!?…]+[\"'”’)\]]*(?=\s|$)",
+    "cjk": r"[。！？!?；;…]+[」』”’）)]*",
+}
+
+_CLAUSE_END = {
+    "default": r"[,;:—–]+(?=\s)",
+    "hi": r"[,;:—–]+(?=\s)",
+    "cjk": r"[，、,：:]+",
+}
+
+# Words a "." ends without ending the sentence, when the next word is capitalized
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "jr", "sr", "vs", "fig", "e.g", "i.e", "cf"}
+
+# The marks above, as the last character of a piece of narration (before any closing quotes)
+_SENTENCE_MARKS = {"default": ".!?…", "hi": "।॥.!?…", "cjk": "。！？!?；;…"}
+_CLAUSE_MARKS = {"default": ",;:—–", "hi": ",;:—–", "cjk": "，、,：:"}
+_CLOSERS = "\"'”’)]」』）"
+
+# Seconds of silence after a sentence and after a clause; the defaults of
+# Kokoro.create, which adds them between the batches it splits a text into
+SENTENCE_PAUSE = 0.25
+CLAUSE_PAUSE = 0.1
+
+
+class Chunk(NamedTuple):
+    """A piece of narration and its phonemes."""
+    text: str
+    phonemes: str
+
+
+def _rules(lang: str) -> str:
+    base = lang.lower().split("-")[0]
+    if base in _CJK_LANGS:
+        return "cjk"
+    if base == "hi":
+        return "hi"
+    return "default"
+
+
+def _split_after(text: str, pattern: str, keep: Callable[[str, int, int], bool] = None) -> List[str]:
+    """
+    Split text after every match of pattern, dropping empty pieces. Matches
+    for which keep(text, start, end) is true don't split.
+    """
+    pieces, start = [], 0
+    for match in re.finditer(pattern, text):
+        if keep is not None and keep(text, match.start(), match.end()):
+            continue
+        piece = text[start:match.end()].strip()
+        if piece:
+            pieces.append(piece)
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        pieces.append(tail)
+    return pieces
+
+
+def _abbreviation(text: str, start: int, end: int) -> bool:
+    """
+    Whether a lone "." ends an abbreviation or an initial rather than a
+    sentence: "Dr. Smith", "J. Smith", or any "." followed by a lowercase word.
+    """
+    if text[start:end] != ".":
+        return False
+    following = text[end:].lstrip()[:1]
+    if following.islower():
+        return True
+    word = text[:start].split()[-1:]
+    word = word[0].lstrip("\"'“‘([").lower() if word else ""
+    return word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha() and word != "i")
+
+
+def split_sentences(text: str, lang: str = "en-us") -> List[str]:
+    """Split text into sentences using language-aware punctuation rules."""
+    rules = _rules(lang)
+    return _split_after(text, _SENTENCE_END[rules], _abbreviation if rules != "cjk" else None)
+
+
+def split_clauses(sentence: str, lang: str = "en-us") -> List[str]:
+    """Split a sentence at clause punctuation (commas, colons, dashes)."""
+    return _split_after(sentence, _CLAUSE_END[_rules(lang)])
+
+
+def _halve(text: str, lang: str) -> List[str]:
+    """Split text in two, at the middle word boundary when there is one."""
+    if _rules(lang) != "cjk":
+        words = text.split()
+        if len(words) > 1:
+            middle = len(words) // 2
+            return [" ".join(words[:middle]), " ".join(words[middle:])]
+    if len(text) < 2:
+        return [text]
+    middle = len(text) // 2
+    return [text[:middle], text[middle:]]
+
+
+def _merge(chunks: List[Chunk], lang: str, max_phonemes: int) -> List[Chunk]:
+    """Greedily join neighbouring chunks while they still fit in one model call."""
+    separator = "" if _rules(lang) == "cjk" else " "
+    merged: List[Chunk] = []
+    for chunk in chunks:
+        if merged and len(merged[-1].phonemes) + 1 + len(chunk.phonemes) <= max_phonemes:
+            last = merged[-1]
+            merged[-1] = Chunk(last.text + separator + chunk.text, last.phonemes + " " + chunk.phonemes)
+        else:
+            merged.append(chunk)
+    return merged
+
+
+def _fit(text: str, lang: str, phonemize: Callable[[str], str],
+         max_phonemes: int, clauses: bool = True) -> List[Chunk]:
+    """Phonemize text, splitting it further until every piece is under the limit."""
+    phonemes = phonemize(text)
+    if len(phonemes) <= max_phonemes:
+        return [Chunk(text, phonemes)]
+
+    parts = split_clauses(text, lang) if clauses else []
+    if len(parts) < 2:
+        parts = _halve(text, lang)
+        if len(parts) < 2:
+            # A single unsplittable token; Kokoro would truncate it anyway
+            return [Chunk(text, phonemes[:max_phonemes])]
+
+    chunks: List[Chunk] = []
+    for part in parts:
+        chunks.extend(_fit(part, lang, phonemize, max_phonemes, clauses=False))
+    return _merge(chunks, lang, max_phonemes)
+
+
+def plan_chunks(text: str, lang: str, phonemize: Callable[[str], str],
+                max_phonemes: int = MAX_PHONEMES) -> List[Chunk]:
+    """
+    Split narration into chunks that each fit in a single model call.
+
+    Every sentence becomes its own chunk so chunks can be synthesized in
+    parallel. Sentences over the phoneme limit are split at clause boundaries,
+    then at word boundaries (characters for CJK).
+
+    Parameters:
+        text (str): The narration text.
+        lang (str): The phonemizer language code, used to pick punctuation rules.
+        phonemize (callable): Maps a piece of text to its phoneme string.
+        max_phonemes (int): Maximum phonemes per chunk.
+
+    Returns:
+        list: The chunks in narration order.
+    """
+    chunks: List[Chunk] = []
+    for sentence in split_sentences(text, lang):
+        chunks.extend(_fit(sentence, lang, phonemize, max_phonemes))
+    return chunks
+
+
+def pause_after(text: str, lang: str = "en-us", sentence_pause: float = SENTENCE_PAUSE,
+                clause_pause: float = CLAUSE_PAUSE) -> float:
+    """Seconds of silence the punctuation ending a piece of narration calls for."""
+    rules = _rules(lang)
+    mark = text.rstrip().rstrip(_CLOSERS)[-1:]
+    if mark and mark in _SENTENCE_MARKS[rules]:
+        return sentence_pause
+    if mark and mark in _CLAUSE_MARKS[rules]:
+        return clause_pause
+    return 0.0
+
+
+def add_pause(audio: np.ndarray, seconds: float, sample_rate: int, crossfade_ms: float = 15.0) -> np.ndarray:
+    """
+    Audio followed by `seconds` of silence once joined to the next chunk: each
+    call of the model is trimmed, so the pause between two chunks is added back
+    (with the length the crossfade takes out of it).
+    """
+    if seconds <= 0:
+        return audio
+    silence = int(sample_rate * seconds) + max(0, int(sample_rate * crossfade_ms / 1000))
+    return np.concatenate([audio, np.zeros(silence, dtype=np.float32)]).astype(np.float32, copy=False)
+
+
+def add_pauses(parts: List[np.ndarray], texts: List[str], lang: str, sample_rate: int,
+               crossfade_ms: float = 15.0) -> List[np.ndarray]:
+    """Every part but the last followed by the pause its text ends on, ready for `join_chunks`."""
+    return [
+        add_pause(part, pause_after(text, lang), sample_rate, crossfade_ms) if i < len(parts) - 1 else part
+        for i, (part, text) in enumerate(zip(parts, texts))
+    ]
+
+
+def join_chunks(parts: List[np.ndarray], sample_rate: int, crossfade_ms: float = 15.0) -> np.ndarray:
+    """Concatenate audio chunks with a short linear crossfade at every seam."""
+    if len(parts) == 1:
+        return parts[0]
+
+    fade_len = max(0, int(sample_rate * crossfade_ms / 1000))
+    out = np.empty(sum(len(part) for part in parts), dtype=np.float32)
+    pos = 0
+    for part in parts:
+        k = min(fade_len, len(part), pos)
+        if k:
+            fade_in = np.linspace(0.0, 1.0, k, dtype=np.float32)
+            seam = out[pos - k:pos]
+            seam *= 1.0 - fade_in
+            seam += part[:k] * fade_in
+        out[pos:pos + len(part) - k] = part[k:]
+        pos += len(part) - k
+    return out[:pos]
+
+
+def seam_offsets(lengths: List[int], sample_rate: int, crossfade_ms: float = 15.0) -> List[int]:
+    """Where each chunk starts in the audio `join_chunks` makes of them."""
+    fade_len = max(0, int(sample_rate * crossfade_ms / 1000))
+    offsets, pos = [], 0
+    for length in lengths:
+        k = min(fade_len, length, pos)
+        offsets.append(pos - k)
+        pos += length - k
+    return offsets
+
+
+def join_stream(parts: Iterable[np.ndarray], sample_rate: int, crossfade_ms: float = 15.0) -> Iterator[np.ndarray]:
+    """
+    `join_chunks` for chunks that arrive one at a time: yields the joined audio
+    piece by piece, holding back only the samples the next crossfade needs.
+    """
+    fade_len = max(0, int(sample_rate * crossfade_ms / 1000))
+    held = np.zeros(0, dtype=np.float32)
+    for part in parts:
+        k = min(fade_len, len(part), len(held))
+        if k:
+            fade_in = np.linspace(0.0, 1.0, k, dtype=np.float32)
+            seam = held[len(held) - k:]
+            seam *= 1.0 - fade_in
+            seam += part[:k] * fade_in
+        joined = np.concatenate([held, part[k:]]).astype(np.float32, copy=False)
+        cut = max(0, len(joined) - fade_len)
+        if cut:
+            yield joined[:cut]
+        held = joined[cut:]
+    if len(held):
+        yield held
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Precision comparison for Kokoro Manim Voiceover
+Synthesizes the sample narrations with each model precision and reports speed
+(real-time factor) and a spectral distance to the fp32 reference (kokoro-mv-compare).
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .setup import PRECISIONS, ensure_model_files
+
+SAMPLES_DIR = Path(__file__).resolve().parent.parent / "samples"
+
+
+def sample_narrations(directory: Path = SAMPLES_DIR) -> List[Tuple[str, str, str]]:
+    """(text, voice, lang) of every literal narration in the sample scenes."""
+    from .prefetch import scan_scene
+
+    narrations = []
+    for scene in sorted(Path(directory).glob("*.py")):
+        for narration in scan_scene(str(scene)):
+            narrations.append((narration.text, narration.config["voice"], narration.config["lang"]))
+    return narrations
+
+
+def average_spectrum(samples: np.ndarray, n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    """Time-averaged power spectrum in dB, which doesn't depend on exact timing."""
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < n_fft:
+        samples = np.pad(samples, (0, n_fft - len(samples)))
+    frames = np.lib.stride_tricks.sliding_window_view(samples, n_fft)[::hop] * np.hanning(n_fft)
+    power = np.mean(np.abs(np.fft.rfft(frames, axis=1)) ** 2, axis=0)
+    return 10 * np.log10(power + 1e-10)
+
+
+def spectral_distance(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Log-spectral distance in dB between the average spectra of two signals."""
+    return float(np.sqrt(np.mean((average_spectrum(reference) - average_spectrum(candidate)) ** 2)))
+
+
+def _model(precision: str):
+    from .registry import registry
+
+    return registry.acquire(*ensure_model_files(precision))
+
+
+def compare(precisions: List[str], narrations: List[Tuple[str, str, str]]) -> List[Dict[str, float]]:
+    """Synthesize the narrations with every precision and measure them against the first."""
+    from .registry import registry
+
+    audio: Dict[str, List[np.ndarray]] = {}
+    report = []
+    for precision in precisions:
+        key, kokoro = _model(precision)
+        # Warm up so the first narration doesn't carry session initialization
+        kokoro.create("Warm up.", voice=narrations[0][1] or "af_sarah", lang="en-us")
+        outputs, synth_time, audio_time = [], 0.0, 0.0
+        for text, voice, lang in narrations:
+            start = time.perf_counter()
+            samples, sample_rate = kokoro.create(text, voice=voice or "af_sarah", lang=lang)
+            synth_time += time.perf_counter() - start
+            audio_time += len(samples) / sample_rate
+            outputs.append(samples)
+        registry.release(key)
+        registry.evict(key)
+        audio[precision] = outputs
+
+        reference = audio[precisions[0]]
+        reference_seconds = report[0]["audio_seconds"] if report else audio_time
+        report.append({
+            "precision": precision,
+            "rtf": synth_time / audio_time,
+            "audio_seconds": audio_time,
+            "distance_db": float(np.mean([spectral_distance(r, c) for r, c in zip(reference, outputs)])),
+            "duration_change": audio_time / reference_seconds - 1,
+        })
+    return report
+
+
+def main():
+    """Main function for the precision comparison script."""
+    parser = argparse.ArgumentParser(
+        prog="kokoro-mv-compare",
+        description="Compare the speed and quality of the model precisions on the sample narrations.",
+    )
+    parser.add_argument("--precision", nargs="+", choices=PRECISIONS, default=list(PRECISIONS),
+                        help="Precisions to compare; the first is the reference (default: fp32 fp16 int8)")
+    # The sample scenes ship with the source checkout, not the installed package
+    has_samples = SAMPLES_DIR.is_dir()
+    parser.add_argument("--samples", default=str(SAMPLES_DIR) if has_samples else None, required=not has_samples,
+                        help="Directory of scenes to take the narrations from"
+                             + (" (default: the repository's samples)" if has_samples else ""))
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N narrations")
+    args = parser.parse_args()
+
+    try:
+        narrations = sample_narrations(Path(args.samples))[:args.limit]
+        if not narrations:
+            print(f"🔍 No narrations found in {args.samples}")
+            sys.exit(1)
+        print(f"🎤 Comparing {', '.join(args.precision)} on {len(narrations)} narrations...")
+        report = compare(args.precision, narrations)
+    except KeyboardInterrupt:
+        print(f"\n\n⏹️  Comparison interrupted by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Comparison failed: {e}")
+        sys.exit(1)
+
+    reference = report[0]
+    print(f"\n{'precision':<10} {'RTF':>7} {'speedup':>8} {'spectral dist':>14} {'duration':>9}")
+    for row in report:
+        print(f"{row['precision']:<10} {row['rtf']:>7.3f} {reference['rtf'] / row['rtf']:>7.2f}x "
+              f"{row['distance_db']:>11.2f} dB {row['duration_change']:>+8.1%}")
+    print(f"\nRTF is synthesis time over audio duration (lower is faster). Spectral distance is the")
+    print(f"log-spectral distance between the average spectra and {reference['precision']} (lower is closer).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Draft mode for Kokoro Manim Voiceover
+Predicts how long a narration will take from its phonemes, so preview renders
+can use silent placeholders of that length and skip synthesis. The prediction
+is a small linear model per voice and language, calibrated from the audio
+already in the cache.
+"""
+
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Seconds per phoneme, per pause and per narration at speed 1.0, before calibration
+DEFAULT_COEFFICIENTS = (0.07, 0.2, 0.25)
+# Cached narrations needed to fit all coefficients; with fewer, the defaults are only rescaled
+MIN_FIT_SAMPLES = 8
+
+MODEL_FILENAME = "draft_model.json"
+# Narrations rendered as drafts, in kokoro-mv-batch manifest format
+MANIFEST_FILENAME = "drafts.jsonl"
+
+# Punctuation Kokoro pauses on, and stress marks, which take no time of their own
+_PAUSES = set(".!?;:,—…")
+_STRESS = set("ˈˌ")
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+_manifest_lock = threading.Lock()
+
+
+def get_tokenizer():
+    """A kokoro_onnx tokenizer for phonemizing without loading the model, created on first use."""
+    global _tokenizer
+    with _tokenizer_lock:
+        if _tokenizer is None:
+            from kokoro_onnx.tokenizer import Tokenizer
+
+            _tokenizer = Tokenizer()
+        return _tokenizer
+
+
+def features(phonemes: str) -> Tuple[int, int]:
+    """Number of spoken phonemes and of pauses in a phoneme string."""
+    pauses = sum(1 for c in phonemes if c in _PAUSES)
+    spoken = sum(1 for c in phonemes if not c.isspace() and c not in _PAUSES and c not in _STRESS)
+    return spoken, pauses
+
+
+def fit(samples: Sequence[Tuple[str, float]]) -> Tuple[float, float, float]:
+    """Coefficients for (phonemes, seconds at speed 1.0) samples."""
+    X = np.array([[*features(phonemes), 1.0] for phonemes, _ in samples])
+    y = np.array([seconds for _, seconds in samples])
+    if len(samples) >= MIN_FIT_SAMPLES:
+        coefficients = np.linalg.lstsq(X, y, rcond=None)[0]
+        if coefficients[0] > 0 and coefficients[1] >= 0:
+            return tuple(float(c) for c in coefficients)
+    # Too few (or too similar) narrations: keep the defaults' shape, scaled to their total length
+    scale = y.sum() / max((X @ np.array(DEFAULT_COEFFICIENTS)).sum(), 1e-9)
+    return tuple(float(c * scale) for c in DEFAULT_COEFFICIENTS)
+
+
+class DurationModel:
+    """
+    Predicts narration durations as (a * phonemes + b * pauses + c) / speed,
+    with coefficients per voice and language.
+    """
+
+    def __init__(self, coefficients: Optional[Dict[str, Sequence[float]]] = None,
+                 samples: Optional[Dict[str, int]] = None):
+        self.coefficients = {key: tuple(value) for key, value in (coefficients or {}).items()}
+        # Number of cached narrations each voice and language was fitted on
+        self.samples = dict(samples or {})
+
+    @staticmethod
+    def key(voice: str, lang: str) -> str:
+        return f"{voice}|{lang}"
+
+    def predict(self, phonemes: str, voice: str, lang: str, speed: float = 1.0) -> float:
+        """Predicted duration in seconds."""
+        a, b, c = self.coefficients.get(self.key(voice, lang), DEFAULT_COEFFICIENTS)
+        spoken, pauses = features(phonemes)
+        return max(0.1, (a * spoken + b * pauses + c) / max(float(speed), 0.1))
+
+    @classmethod
+    def load(cls, cache_dir: str) -> "DurationModel":
+        try:
+            with open(Path(cache_dir) / MODEL_FILENAME, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(data.get("coefficients"), data.get("samples"))
+        except (OSError, ValueError, AttributeError):
+            return cls()
+
+    def save(self, cache_dir: str) -> None:
+        path = Path(cache_dir) / MODEL_FILENAME
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"coefficients": self.coefficients, "samples": self.samples}, f, indent=2)
+        os.replace(tmp, path)
+
+    def calibrate(self, voice: str, lang: str, samples: Callable[[], List[Tuple[str, float]]],
+                  count: int) -> bool:
+        """
+        Refit a voice and language when the cache holds a different number of
+        its narrations than it was fitted on. `samples` is only called then.
+
+        Returns:
+            bool: Whether the model changed.
+        """
+        key = self.key(voice, lang)
+        if count == 0 or self.samples.get(key) == count:
+            return False
+        data = samples()
+        if not data:
+            return False
+        self.coefficients[key] = fit(data)
+        self.samples[key] = count
+        return True
+
+
+def queue_draft(cache_dir: str, row: Dict[str, Any]) -> None:
+    """Remember a narration rendered as a draft, so it can be synthesized later."""
+    path = Path(cache_dir) / MANIFEST_FILENAME
+    line = json.dumps(row, ensure_ascii=False, sort_keys=True)
+    with _manifest_lock:
+        if line in pending_lines(cache_dir):
+            return
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def pending_lines(cache_dir: str) -> List[str]:
+    """The lines of the drafts manifest."""
+    try:
+        with open(Path(cache_dir) / MANIFEST_FILENAME, "r", encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def take_drafts(cache_dir: str, matches: Callable[[Dict[str, Any]], bool]) -> List[Dict[str, Any]]:
+    """Remove the queued drafts a predicate matches from the manifest and return them."""
+    path = Path(cache_dir) / MANIFEST_FILENAME
+    with _manifest_lock:
+        taken, kept = [], []
+        for line in pending_lines(cache_dir):
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            (taken if matches(row) else kept).append((row, line))
+        if taken:
+            if kept:
+                tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(line + "\n" for _, line in kept)
+                os.replace(tmp, path)
+            else:
+                path.unlink()
+    return [row for row, _ in taken]
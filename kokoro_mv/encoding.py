@@ -0,0 +1,236 @@
+"""
+Audio encoding for Kokoro Manim Voiceover
+Encodes PCM buffers straight to their final file, without an intermediate WAV.
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+from scipy.io.wavfile import write as write_wav
+
+
+# Output formats: file extension and the ffmpeg output arguments (None = written in-process)
+FORMATS = {
+    "mp3": (".mp3", ["-f", "mp3", "-b:a", "312k"]),
+    "wav": (".wav", None),
+    "flac": (".flac", ["-f", "flac"]),
+    "opus": (".opus", ["-c:a", "libopus", "-b:a", "96k", "-f", "ogg"]),
+}
+
+
+def _ffmpeg() -> str:
+    path = shutil.which("ffmpeg")
+    if path is None:
+        raise RuntimeError("ffmpeg was not found on PATH; it is required to encode compressed audio.")
+    return path
+
+
+def _temp_path(output_path: Path) -> str:
+    """A unique temporary file next to the output, so it can be renamed into place."""
+    return str(output_path.parent / f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+
+
+def _to_int16(samples: np.ndarray) -> np.ndarray:
+    if samples.dtype == np.int16:
+        return samples
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def format_from_path(path: str) -> str:
+    """Return the output format name for a file path, based on its extension."""
+    suffix = Path(path).suffix.lower()
+    for name, (extension, _) in FORMATS.items():
+        if extension == suffix:
+            return name
+    raise ValueError(f"Unsupported audio format: {suffix}")
+
+
+def write_audio(samples: np.ndarray, sample_rate: int, output_path: str, fmt: Optional[str] = None) -> None:
+    """
+    Encode mono PCM samples and atomically write them to output_path.
+
+    Compressed formats are encoded by piping 16-bit PCM into ffmpeg's stdin;
+    WAV is written in-process. The format defaults to the file extension.
+    """
+    output_path = Path(output_path)
+    fmt = fmt or format_from_path(output_path)
+    _, ffmpeg_args = FORMATS[fmt]
+    pcm = np.ascontiguousarray(_to_int16(samples), dtype="<i2")
+    tmp_path = _temp_path(output_path)
+    try:
+        if ffmpeg_args is None:
+            write_wav(tmp_path, sample_rate, pcm)
+        else:
+            command = [
+                _ffmpeg(), "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+                *ffmpeg_args, tmp_path,
+            ]
+            result = subprocess.run(command, input=pcm.tobytes(), stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE)
+            if result.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed to encode {output_path}: "
+                                   f"{result.stderr.decode(errors='replace').strip()}")
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class AudioWriter:
+    """
+    Encodes mono 16-bit PCM written block by block, for audio that should not
+    be held in memory at once. Compressed formats stream into ffmpeg's stdin;
+    WAV is written in-process. The file appears at output_path on `close`.
+    Use as a context manager; an exception discards the partial file.
+    """
+
+    def __init__(self, output_path: str, sample_rate: int, fmt: Optional[str] = None):
+        self.output_path = Path(output_path)
+        fmt = fmt or format_from_path(self.output_path)
+        _, ffmpeg_args = FORMATS[fmt]
+        self._tmp_path = _temp_path(self.output_path)
+        self._wav = None
+        self._process = None
+        if ffmpeg_args is None:
+            self._wav = wave.open(self._tmp_path, "wb")
+            self._wav.setnchannels(1)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(sample_rate)
+        else:
+            command = [
+                _ffmpeg(), "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+                *ffmpeg_args, self._tmp_path,
+            ]
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                             stderr=subprocess.PIPE)
+
+    def write(self, samples: np.ndarray) -> None:
+        pcm = np.ascontiguousarray(_to_int16(samples), dtype="<i2")
+        if self._wav is not None:
+            self._wav.writeframesraw(pcm.data)
+        else:
+            self._process.stdin.write(pcm.data)
+
+    def close(self) -> None:
+        """Finish encoding and move the file into place."""
+        if self._wav is not None:
+            self._wav.close()
+        else:
+            _, stderr = self._process.communicate()
+            if self._process.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed to encode {self.output_path}: "
+                                   f"{stderr.decode(errors='replace').strip()}")
+        os.replace(self._tmp_path, self.output_path)
+
+    def abort(self) -> None:
+        """Stop encoding and remove the partial file."""
+        if self._wav is not None:
+            self._wav.close()
+        elif self._process.poll() is None:
+            self._process.kill()
+            self._process.communicate()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                self.close()
+            except BaseException:
+                self.abort()
+                raise
+        else:
+            self.abort()
+
+
+_encoder: Optional[ThreadPoolExecutor] = None
+_encoder_lock = threading.Lock()
+
+
+def encode_in_background(samples: np.ndarray, sample_rate: int, output_path: str,
+                         fmt: Optional[str] = None) -> Future:
+    """Queue `write_audio` on the background encoder thread, so inference can continue meanwhile."""
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            _encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kokoro-encode")
+    return _encoder.submit(write_audio, samples, sample_rate, output_path, fmt)
+
+
+def audio_metadata(path: str, sample_count: int, sample_rate: int, fmt: str) -> dict:
+    """Metadata of a freshly written audio file, as stored in its cache entry."""
+    return {
+        "duration": sample_count / sample_rate,
+        "sample_rate": int(sample_rate),
+        "sample_count": int(sample_count),
+        "codec": fmt,
+        "file_size": os.path.getsize(path),
+    }
+
+
+def _read_info(path: str):
+    import mutagen
+
+    audio = mutagen.File(path)
+    if audio is None:
+        raise ValueError(f"Unrecognized audio file: {path}")
+    return audio.info
+
+
+def read_metadata(path: str) -> dict:
+    """`audio_metadata` read from the header of an audio file, for entries recorded without it."""
+    info = _read_info(path)
+    sample_rate = int(getattr(info, "sample_rate", 0) or 0)
+    return {
+        "duration": info.length,
+        "sample_rate": sample_rate,
+        "sample_count": round(info.length * sample_rate),
+        "codec": Path(path).suffix.lstrip(".").lower(),
+        "file_size": os.path.getsize(path),
+    }
+
+
+# Durations from cache entry metadata, by absolute path. Cached audio is named
+# after its content hash, so a path always holds the same audio.
+_durations: Dict[str, float] = {}
+
+
+def remember_duration(path: str, duration: float) -> None:
+    """Let `get_duration` answer for a file without opening it."""
+    _durations[os.path.abspath(path)] = float(duration)
+
+
+def get_duration(path: str) -> float:
+    """
+    Duration of an audio file in seconds: from its cache entry's metadata when
+    known, otherwise read from its header (any supported format).
+    """
+    duration = _durations.get(os.path.abspath(path))
+    if duration is not None:
+        return duration
+    return _read_info(path).length
+
+
+def install_duration_hook() -> None:
+    """
+    Make manim_voiceover's tracker use `get_duration`, which takes durations
+    from cache entry metadata and reads every format. Its built-in
+    `get_duration` decodes the file and only understands MP3.
+    """
+    import manim_voiceover.tracker
+
+    manim_voiceover.tracker.get_duration = get_duration
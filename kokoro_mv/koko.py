@@ -4,64 +4,230 @@ All rights reserved.
 This file is part of the Manim Voiceover project.
 """
 
-import hashlib
-import json
+import http.client
 import numpy as np
 import os
+import sys
+import threading
 import urllib.request
+import uuid
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from manim_voiceover.helper import remove_bookmarks
 from manim_voiceover.services.base import SpeechService
-from kokoro_onnx import Kokoro
-from manim_voiceover.helper import remove_bookmarks, wav2mp3
-from scipy.io.wavfile import write as write_wav
+from scipy.io.wavfile import read as read_wav
+
+from .backends import CacheBackend, HTTPBackend, upload_in_background
+from .batching import MAX_BATCH, batched_inference, bucket_by_length, create_timed
+from .cache import build_input_data, hash_input_data, open_index
+from .chunking import (Chunk, add_pause, add_pauses, join_chunks, join_stream, pause_after, plan_chunks, seam_offsets,
+                       split_sentences)
+from .draft import DurationModel, get_tokenizer, queue_draft, take_drafts
+from .encoding import (FORMATS, AudioWriter, audio_metadata, encode_in_background, get_duration, install_duration_hook,
+                       read_metadata, remember_duration, write_audio)
+from .locking import voiceover_lock
+from .optimize import optimized_model as find_optimized_model
+from .phonemes import get_phoneme_cache
+from .pool import get_pool, in_pool
+from .postprocess import PostProcessor
+from .registry import registry
+from .runtime import session_config
+from .segments import SegmentCache
+from .setup import get_model_info
+from .server import DEFAULT_ADDRESS, SynthesisClient
+from .store import AudioStore
+from .timing import Word, chunk_words, join_words, locate, shift, word_boundaries
+
+# Kokoro's output sample rate (kokoro_onnx.config.SAMPLE_RATE)
+SAMPLE_RATE = 24000
+
+
+def _item_future(job: Future, index: int) -> Future:
+    """A future for one item of a job future that resolves to a list."""
+    item = Future()
+
+    def resolve(future):
+        if future.cancelled():
+            item.cancel()
+        elif future.exception() is not None:
+            item.set_exception(future.exception())
+        else:
+            item.set_result(future.result()[index])
+
+    job.add_done_callback(resolve)
+    return item
+
+
+def _caller_file():
+    """Returns the file of the first stack frame outside this package."""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    frame = sys._getframe(1)
+    while frame is not None and os.path.dirname(os.path.abspath(frame.f_code.co_filename)) == package_dir:
+        frame = frame.f_back
+    if frame is None or not os.path.isfile(frame.f_code.co_filename):
+        return None
+    return frame.f_code.co_filename
 
 
 class KokoroService(SpeechService):
     """Speech service class for kokoro_self (using text_to_speech via Kokoro ONNX)."""
 
     def __init__(self, engine=None, model_path: str = "", voices_path: str = "",
-                 voice: str = '', speed: float = 1.0, lang: str = "en-us", volume: float = 1.0, **kwargs):
-        
-        # Auto-download model files if they don't exist
-        model_path, voices_path = self._ensure_model_files(model_path, voices_path)
-        
-        self.kokoro = Kokoro(model_path, voices_path)
+                 voice: str = '', speed: float = 1.0, lang: str = "en-us", volume: float = 1.0,
+                 session_options: dict = None, prefetch=False, chunk_workers: int = None,
+                 crossfade_ms: float = 15.0, segment_cache: bool = True, output_format: str = "mp3",
+                 phoneme_cache: bool = True, max_cache_size=None, global_cache: bool = None,
+                 cache_backend: CacheBackend = None, server=None, batch_size: int = MAX_BATCH,
+                 intra_op_threads=None, inter_op_threads=None, graph_optimization: str = None,
+                 execution_mode: str = None, memory_arena: bool = None, optimized_model: bool = True,
+                 precision: str = None, post_processing=None, stream=False, draft: bool = None, **kwargs):
+
+        # The model is downloaded and loaded lazily on the first cache miss,
+        # so fully cached renders never touch the model files.
+        self.model_path = model_path
+        self.voices_path = voices_path
+        # ONNX Runtime session options; the arguments override session_options and KOKORO_MV_* variables
+        self.session_options = session_config(intra_op_threads, inter_op_threads, graph_optimization,
+                                              execution_mode, memory_arena, session_options)
+        # Model variant: "fp32", "fp16" or "int8"; part of the cache key so precisions never mix
+        self.precision = precision or os.getenv("KOKORO_MV_PRECISION") or "fp32"
+        get_model_info(self.precision)
+        # Load the graph kokoro-mv-setup pre-optimized for this machine when it is valid
+        self.use_optimized_model = optimized_model
+        self._kokoro = None
+        self._model_key = None
+        self._release = None
+        self._model_lock = threading.Lock()
         self.voice = voice
         self.speed = speed
         self.lang = lang
         self.volume = float(volume)
 
+        # Long narration is split into sentence chunks synthesized in parallel
+        self.chunk_workers = chunk_workers or min(4, os.cpu_count() or 1)
+        self.crossfade_ms = crossfade_ms
+        # Chunks of similar length go through the model as padded batches of up to this many
+        self.batch_size = batch_size
+        # Reuse the audio of unchanged sentences when a voiceover is edited
+        self.segment_cache = segment_cache
+        # Reuse phonemization across voices, speeds and volumes
+        self.phoneme_cache = phoneme_cache
+        # Size cap for the cache directory ("2GB", bytes or None); least recently used entries go first
+        self.max_cache_size = max_cache_size if max_cache_size is not None else os.getenv("KOKORO_MV_CACHE_MAX_SIZE")
+        # Share synthesized voiceovers across projects through the machine-wide store
+        if global_cache is None:
+            global_cache = os.getenv("KOKORO_MV_GLOBAL_CACHE", "").lower() in ("1", "true", "yes")
+        self.global_cache = global_cache
+        # Shared stores consulted on a local miss, in order, and uploaded to after synthesis
+        self.cache_backends = []
+        if global_cache:
+            self.cache_backends.append(AudioStore())
+        if cache_backend is None and os.getenv("KOKORO_MV_CACHE_URL"):
+            cache_backend = HTTPBackend(os.getenv("KOKORO_MV_CACHE_URL"))
+        if cache_backend is not None:
+            self.cache_backends.append(cache_backend)
+
+        # Forward synthesis to a kokoro-mv-serve daemon that keeps the model loaded
+        if server is None:
+            server = os.getenv("KOKORO_MV_SERVER")
+        if server is True:
+            server = DEFAULT_ADDRESS
+        self.server = SynthesisClient(server) if server else None
+
+        # Post-processing stages run before the volume gain; e.g. [LoudnessNormalize(-18), TrimSilence(), Fade()]
+        self.post_processor = post_processing if isinstance(post_processing, PostProcessor) else PostProcessor(post_processing)
+
+        # Stream narration to the encoder as it is synthesized, with memory use independent of its length:
+        # True for every narration, or a number of characters from which narration is streamed
+        self.stream = stream
+
+        # Draft renders get silent placeholders of the predicted duration instead of synthesized audio
+        if draft is None:
+            draft = os.getenv("KOKORO_MV_DRAFT", "").lower() in ("1", "true", "yes")
+        self.draft = draft
+        self._duration_models = {}
+        self._drafts_taken = set()
+
+        # Output codec: "mp3", "wav", "flac" or "opus"
+        if output_format not in FORMATS:
+            raise ValueError(f"Unsupported output_format {output_format!r}, expected one of {sorted(FORMATS)}")
+        self.output_format = output_format
+        # The tracker takes durations from the cache entries instead of opening the audio;
+        # on its own it can only read MP3 (draft placeholders and other formats aren't)
+        install_duration_hook()
+
         if engine is None:
             engine = self.text_to_speech  # Default to local function
 
         self.engine = engine
+        self._prefetched = {}
         super().__init__(**kwargs)
 
+        # prefetch=True scans the file that created this service (the scene);
+        # a path scans that file instead.
+        if prefetch:
+            scene_file = prefetch if isinstance(prefetch, (str, os.PathLike)) else _caller_file()
+            if scene_file is not None:
+                self.prefetch_scene(scene_file)
+
     def _ensure_model_files(self, model_path: str, voices_path: str):
         """Ensure model files exist, download them if missing."""
+        model_url, voices_url, model_file, voices_file = get_model_info(self.precision)
+
         # Default file names if not specified
         if not model_path:
-            model_path = "kokoro-v1.0.onnx"
+            model_path = model_file
         if not voices_path:
-            voices_path = "voices-v1.0.bin"
+            voices_path = voices_file
         
         # Download model file if it doesn't exist
         if not os.path.exists(model_path):
             print(f"📥 Downloading model file: {model_path}")
-            self._download_file(
-                "https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx",
-                model_path
-            )
+            self._download_file(model_url, model_path)
         
         # Download voices file if it doesn't exist
         if not os.path.exists(voices_path):
             print(f"📥 Downloading voices file: {voices_path}")
-            self._download_file(
-                "https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin",
-                voices_path
-            )
+            self._download_file(voices_url, voices_path)
         
         return model_path, voices_path
+
+    @property
+    def kokoro(self):
+        """The shared Kokoro model, downloaded and loaded on first access."""
+        if self._kokoro is None:
+            with self._model_lock:
+                if self._kokoro is None:
+                    # Auto-download model files if they don't exist
+                    model_path, voices_path = self._ensure_model_files(self.model_path, self.voices_path)
+
+                    # Share one loaded model per process; the reference is dropped on
+                    # release() or when the service is garbage collected.
+                    session_options = self.session_options
+                    optimized = find_optimized_model(model_path) if self.use_optimized_model else None
+                    if optimized is not None:
+                        # The artifact is already optimized, so the passes are skipped on load
+                        model_path = optimized
+                        session_options = {"graph_optimization_level": "disable", **session_options}
+                    key, kokoro = registry.acquire(model_path, voices_path, session_options)
+                    self._model_key = key
+                    self._release = weakref.finalize(self, registry.release, key)
+                    self._kokoro = kokoro
+        return self._kokoro
+
+    @kokoro.setter
+    def kokoro(self, value):
+        self.release()
+        self._kokoro = value
+
+    def release(self):
+        """Drop this service's reference to the shared model. Safe to call more than once."""
+        with self._model_lock:
+            if self._release is not None:
+                self._release()
+                self._release = None
+            self._kokoro = None
     
     def _download_file(self, url: str, filename: str):
         """Download a file from URL with progress indication."""
@@ -89,83 +255,692 @@ class KokoroService(SpeechService):
         Returns:
             str: The generated hash as a string.
         """
-        # Convert the input data dictionary to a JSON string (sorted for consistency)
-        data_str = json.dumps(input_data, sort_keys=True)
-        # Generate a SHA-256 hash of the JSON string
-        return hashlib.sha256(data_str.encode('utf-8')).hexdigest()
+        # SHA-256 of the input data serialized as JSON (sorted for consistency)
+        return hash_input_data(input_data)
+
+    def get_cached_result(self, input_data: dict, cache_dir):
+        """
+        Looks up a cache entry in the SQLite index of the cache directory.
+        Entries manim_voiceover appends to cache.json are imported into the
+        index as they appear, instead of the file being scanned on every
+        voiceover block.
+        """
+        index = open_index(cache_dir, self.max_cache_size)
+        index.import_json()
+        data_hash = self.get_data_hash(input_data)
+        json_dict = index.lookup(data_hash)
+        if json_dict is None:
+            return None
+        if ("word_boundaries" not in json_dict and self.engine == self.text_to_speech
+                and "<bookmark" in input_data["input_text"]):
+            # Entries from before word timing spoke the bookmark tags and can't place them
+            return None
+        return self._describe(json_dict, cache_dir, data_hash)
+
+    def _describe(self, json_dict: dict, cache_dir: str, data_hash: str = None) -> dict:
+        """
+        Hands the duration in an entry's metadata to the tracker. Entries from
+        before metadata was stored get it from the audio header once, and the
+        index is updated when data_hash is given.
+        """
+        audio_file = str(Path(cache_dir) / json_dict["original_audio"])
+        if "metadata" not in json_dict:
+            try:
+                json_dict["metadata"] = read_metadata(audio_file)
+            except Exception:
+                return json_dict
+            if data_hash is not None:
+                open_index(cache_dir, self.max_cache_size).record(data_hash, json_dict)
+        remember_duration(audio_file, json_dict["metadata"]["duration"])
+        return json_dict
 
     import numpy as np
 
     def text_to_speech(self, text, output_file, voice_name, speed, lang, volume: float = 1.0):
         """
         Generates speech from text using Kokoro ONNX and saves the audio file.
-        Normalizes the audio to make it audible.
+        Normalizes the audio to make it audible. The codec is picked from the
+        output file extension and the file is written atomically.
         """
-        # Generate audio samples using Kokoro
-        samples, sample_rate = self.kokoro.create(
-            text, voice=voice_name, speed=speed, lang=lang
-        )
-
-        # Normalize audio to the range [-1, 1]
-        max_val = np.max(np.abs(samples))
-        if max_val > 0:
-            samples = samples / max_val
+        if self._streams(text):
+            self._stream_to_file(text, output_file, voice_name, speed, lang, volume)
+        else:
+            samples, sample_rate, _ = self._render(text, voice_name, speed, lang, volume)
 
-        # Apply post-gain based on volume, with clipping to avoid distortion
-        try:
-            gain = float(volume)
-        except Exception:
-            gain = 1.0
-        if not np.isfinite(gain):
-            gain = 1.0
-        samples = np.clip(samples * gain, -1.0, 1.0)
-
-        # Convert to 16-bit integer PCM format
-        samples = (samples * 32767).astype("int16")
-
-        # Save the normalized audio as a .wav file
-        write_wav(output_file, sample_rate, samples)
+            # Encode the normalized audio without an intermediate file
+            write_audio(samples, sample_rate, output_file)
         print(f"Saved at {output_file}")
 
         return output_file
 
+    def _render(self, text, voice_name, speed, lang, volume: float = 1.0, cache_dir: str = None):
+        """
+        Synthesizes text and returns normalized 16-bit PCM samples, the sample
+        rate and the word boundaries of the audio. Sentences are cached in the
+        segment cache of `cache_dir` (default: the service's).
+        """
+        samples = None
+        if self.server is not None and self.server.available:
+            try:
+                samples, sample_rate, words = self.server.synthesize(text, voice_name, speed, lang, self.precision)
+                if words is None:
+                    # An older server only returns audio, so words are placed in proportion to their length
+                    words = chunk_words(text, None, len(samples), sample_rate)
+            except ConnectionError as e:
+                print(f"⚠️  {e}; synthesizing in-process")
+
+        if samples is None:
+            # Generate audio samples using Kokoro
+            samples, sample_rate, words = self._create_samples(text, voice_name, speed, lang, cache_dir)
+        samples, boundaries = self._postprocess(samples, sample_rate, volume, words)
+        return samples, sample_rate, boundaries
+
+    def _streams(self, text: str) -> bool:
+        """Whether a narration is synthesized with `_stream_to_file`."""
+        if isinstance(self.stream, bool):
+            return self.stream
+        return self.stream is not None and len(text) >= self.stream
+
+    def _stream_to_file(self, text, output_file, voice_name, speed, lang, volume: float = 1.0,
+                        cache_dir: str = None):
+        """
+        Synthesizes a narration into an audio file without holding it in memory
+        and returns its length in samples and its word boundaries.
+
+        Sentences are synthesized a batch at a time and appended to a float32
+        spill file next to the output. Normalization needs the whole narration
+        (its peak, loudness or silence edges), so the post-processing chain then
+        runs over the memory-mapped spill file and the result is quantized and
+        fed to the encoder block by block. The audio is the same as without
+        streaming; only pages of the spill file are ever resident.
+        """
+        output_file = Path(output_file)
+        spill = output_file.parent / f".{output_file.name}.{uuid.uuid4().hex}.f32"
+        words = []
+        try:
+            length = 0
+            with open(spill, "wb") as f:
+                for samples in join_stream(self._stream_samples(text, voice_name, speed, lang, words, cache_dir),
+                                           SAMPLE_RATE, self.crossfade_ms):
+                    samples.astype("<f4", copy=False).tofile(f)
+                    length += len(samples)
+
+            buffer = np.memmap(spill, dtype="<f4", mode="r+", shape=(length,)) if length else np.zeros(0, np.float32)
+            blocks, start = self.post_processor.process_blocks(buffer, SAMPLE_RATE, volume)
+            written = 0
+            with AudioWriter(str(output_file), SAMPLE_RATE, self.output_format) as writer:
+                for block in blocks:
+                    writer.write(block)
+                    written += len(block)
+            del buffer, blocks
+        finally:
+            if spill.exists():
+                spill.unlink()
+        return written, word_boundaries(words, SAMPLE_RATE, start, written)
+
+    def _stream_samples(self, text: str, voice_name: str, speed: float, lang: str, words: list = None,
+                        cache_dir: str = None):
+        """
+        Yields the float samples of a narration sentence by sentence, synthesizing
+        a batch of sentences at a time. Word timings are appended to `words`.
+        """
+        sentences = split_sentences(text, lang) or [text]
+        offsets = locate(text, sentences)
+        fade_len = max(0, int(SAMPLE_RATE * self.crossfade_ms / 1000))
+        position = 0
+        step = max(1, self.batch_size)
+        for start in range(0, len(sentences), step):
+            batch = self._create_samples_batch(sentences[start:start + step], voice_name, speed, lang, cache_dir)
+            for j, (offset, (samples, _, sentence_words)) in enumerate(zip(offsets[start:start + step], batch)):
+                if start + j < len(sentences) - 1:
+                    samples = add_pause(samples, pause_after(sentences[start + j], lang), SAMPLE_RATE,
+                                        self.crossfade_ms)
+                # Where join_stream puts this sentence
+                k = min(fade_len, len(samples), position)
+                if words is not None:
+                    words.extend(shift(sentence_words, offset, position - k))
+                position += len(samples) - k
+                yield samples
+
+    def _render_batch(self, texts, voice_name, speed, lang, volume: float = 1.0, cache_dir: str = None):
+        """`_render` for several texts, with their chunks synthesized in shared batches."""
+        if self.server is not None and self.server.available:
+            return [self._render(text, voice_name, speed, lang, volume, cache_dir) for text in texts]
+        rendered = []
+        for samples, sample_rate, words in self._create_samples_batch(texts, voice_name, speed, lang, cache_dir):
+            samples, boundaries = self._postprocess(samples, sample_rate, volume, words)
+            rendered.append((samples, sample_rate, boundaries))
+        return rendered
+
+    def _postprocess(self, samples, sample_rate: int, volume: float = 1.0, words=()):
+        """
+        Runs the post-processing chain (peak normalization by default), applies
+        the volume gain with clipping and converts to 16-bit PCM. Works in place
+        on the float32 synthesis buffer. Returns the PCM and the word boundaries
+        of `words` in it, which move when the chain trims.
+        """
+        pcm, start = self.post_processor.process_span(samples, sample_rate, volume)
+        return pcm, word_boundaries(words, sample_rate, start, len(pcm))
+
+    def _phonemize(self, text: str, lang: str) -> str:
+        """
+        Converts text to the phoneme string Kokoro consumes. Results are kept in
+        the persistent phoneme cache; the model is only loaded on a cache miss.
+        """
+        if not self.phoneme_cache:
+            return self.kokoro.tokenizer.phonemize(text, lang)
+        return get_phoneme_cache().phonemize(
+            text, lang, lambda text, lang: self.kokoro.tokenizer.phonemize(text, lang)
+        )
+
+    def synthesize_samples(self, text: str, voice_name: str, speed: float, lang: str, cache_dir: str = None):
+        """
+        Synthesizes text without post-processing or caching the voiceover, e.g.
+        for kokoro-mv-serve. Returns the float32 samples, the sample rate and
+        the timing of every word (`timing.Word`, in samples).
+        """
+        return self._create_samples(text, voice_name, speed, lang, cache_dir)
+
+    def _create_samples(self, text: str, voice_name: str, speed: float, lang: str, cache_dir: str = None):
+        """
+        Synthesizes text sentence by sentence. Sentences found in the segment
+        cache of `cache_dir` (default: the service's) are reused; the rest are
+        split into chunks under Kokoro's phoneme limit, synthesized in parallel
+        and stored. Sentences are joined with a short crossfade after the pause
+        their punctuation calls for, as Kokoro puts between its own batches.
+        Returns the samples, the sample rate and the timing of every word, from
+        the phoneme durations the model predicted.
+        """
+        return self._create_samples_batch([text], voice_name, speed, lang, cache_dir)[0]
+
+    def _create_samples_batch(self, texts, voice_name: str, speed: float, lang: str, cache_dir: str = None):
+        """`_create_samples` for several texts; returns (samples, sample rate, words) per text."""
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+        # The index counts segments towards the cache size cap, evicting the least recently used
+        index = open_index(cache_dir, self.max_cache_size) if self.segment_cache else None
+        segments = index.segments if index is not None else None
+        sample_rate = SAMPLE_RATE
+
+        texts_sentences = [split_sentences(text, lang) or [text] for text in texts]
+        parts = {}  # (text index, sentence index) -> samples
+        words = {}  # (text index, sentence index) -> words, relative to the sentence
+        keys = {}
+        hits = []
+        jobs = []  # ((text index, sentence index), chunk)
+        for t, sentences in enumerate(texts_sentences):
+            for i, sentence in enumerate(sentences):
+                keys[t, i] = SegmentCache.key(sentence, voice_name, lang, speed, self.precision)
+                if segments is not None:
+                    parts[t, i] = segments.load(keys[t, i])
+                    if parts[t, i] is not None:
+                        hits.append(keys[t, i])
+                        stored = segments.load_words(keys[t, i])
+                        # Segments cached before word timing have none stored, so estimate them
+                        words[t, i] = ([Word(*word) for word in stored] if stored is not None
+                                       else chunk_words(sentence, None, len(parts[t, i]), sample_rate))
+                if parts.get((t, i)) is None:
+                    chunks = plan_chunks(sentence, lang, lambda piece: self._phonemize(piece, lang))
+                    jobs.extend(((t, i), chunk) for chunk in chunks or [Chunk(sentence, self._phonemize(sentence, lang))])
+
+        if hits:
+            index.touch_segments(hits)
+        results = self._synthesize_chunks([chunk.phonemes for _, chunk in jobs], voice_name, speed, lang)
+
+        pending = {}
+        for (part, chunk), (audio, timings) in zip(jobs, results):
+            pending.setdefault(part, []).append((chunk.text, audio, chunk_words(chunk.text, timings, len(audio), sample_rate)))
+        for (t, i), synthesized in pending.items():
+            # Each chunk was trimmed by the model, so the pause after its clause is added back
+            audios = add_pauses([audio for _, audio, _ in synthesized], [text for text, _, _ in synthesized],
+                                lang, sample_rate, self.crossfade_ms)
+            parts[t, i] = join_chunks(audios, sample_rate, self.crossfade_ms)
+            words[t, i] = join_words(texts_sentences[t][i], [text for text, _, _ in synthesized],
+                                     [chunk for _, _, chunk in synthesized],
+                                     seam_offsets([len(audio) for audio in audios], sample_rate, self.crossfade_ms))
+            if segments is not None:
+                size = segments.store(keys[t, i], parts[t, i], [list(word) for word in words[t, i]])
+                index.record_segment(keys[t, i], size)
+
+        results = []
+        for t, sentences in enumerate(texts_sentences):
+            audios = add_pauses([parts[t, i] for i in range(len(sentences))], sentences, lang, sample_rate,
+                                self.crossfade_ms)
+            starts = seam_offsets([len(audio) for audio in audios], sample_rate, self.crossfade_ms)
+            results.append((join_chunks(audios, sample_rate, self.crossfade_ms), sample_rate,
+                            join_words(texts[t], sentences, [words[t, i] for i in range(len(sentences))], starts)))
+        return results
+
+    def _synthesize_chunks(self, phonemes, voice_name: str, speed: float, lang: str):
+        """
+        Synthesizes phoneme chunks and returns their float samples and phoneme
+        timings (None if the model doesn't report durations) in order.
+        With a model that supports it, chunks of similar length run as padded
+        batches; otherwise each chunk is its own call, in parallel.
+        """
+        if not phonemes:
+            return []
+        workers = max(1, self.chunk_workers)
+        inference = batched_inference(self.kokoro) if self.batch_size > 1 else None
+        if inference is not None and inference.supported and len(phonemes) > 1:
+            buckets = bucket_by_length([len(p) for p in phonemes], self.batch_size)
+
+            def synthesize(bucket):
+                return inference.synthesize_timed([phonemes[j] for j in bucket], voice_name, speed)
+
+            results = [None] * len(phonemes)
+            with ThreadPoolExecutor(min(len(buckets), workers), thread_name_prefix="kokoro-chunk") as executor:
+                for bucket, outputs in zip(buckets, executor.map(synthesize, buckets)):
+                    for j, output in zip(bucket, outputs):
+                        results[j] = output
+            return results
+
+        def synthesize(chunk):
+            return create_timed(self.kokoro, chunk, voice_name, speed, lang)
+
+        if len(phonemes) == 1:
+            return [synthesize(phonemes[0])]
+        with ThreadPoolExecutor(min(len(phonemes), workers), thread_name_prefix="kokoro-chunk") as executor:
+            return list(executor.map(synthesize, phonemes))
+
+    def _input_data(self, text: str) -> dict:
+        """Build the cache lookup data for a narration."""
+        # A custom post-processing chain changes the audio, so it is part of the key
+        post_processing = repr(self.post_processor.stages)
+        if post_processing == repr(PostProcessor().stages):
+            post_processing = None
+        return build_input_data(text, self.voice, self.lang, self.volume, self.output_format, self.precision,
+                                post_processing, self.speed)
+
+    def prefetch(self, texts, cache_dir: str = None):
+        """
+        Synthesizes narrations into the cache on the shared synthesis pool.
+        A later voiceover block for the same text then waits for (or reuses)
+        the prefetched result instead of synthesizing in the render loop.
+        Narrations that don't fit in the pool's queue are left to the render loop.
+        Does nothing in draft mode, where the render loop doesn't synthesize.
+
+        Parameters:
+            texts (iterable): Narration texts, as passed to `voiceover(text=...)`.
+            cache_dir (str): Cache directory to synthesize into. Defaults to the service's.
+        """
+        if self.draft:
+            return
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+
+        pending = {}
+        for text in texts:
+            # Same normalization manim_voiceover applies before generate_from_text
+            text = " ".join(text.split())
+            input_data = self._input_data(text)
+            data_hash = self.get_data_hash(input_data)
+            if data_hash in self._prefetched or data_hash in pending or self.get_cached_result(input_data, cache_dir) is not None:
+                continue
+            pending[data_hash] = (text, input_data)
+
+        # Each pool job synthesizes a group of narrations, so their chunks share padded batches
+        group_size = max(1, self.batch_size)
+        items = list(pending.items())
+        for start in range(0, len(items), group_size):
+            group = items[start:start + group_size]
+            try:
+                job = get_pool().submit(
+                    self._synthesize_many, [text for _, (text, _) in group],
+                    [input_data for _, (_, input_data) in group], cache_dir, block=False
+                )
+            except TimeoutError:
+                break
+            for index, (data_hash, _) in enumerate(group):
+                self._prefetched[data_hash] = _item_future(job, index)
+
+    def prefetch_scene(self, scene_file: str, cache_dir: str = None):
+        """Prefetches every literal narration in a scene file that uses this service's configuration."""
+        from .prefetch import scan_scene, matches_service
+
+        narrations = scan_scene(scene_file)
+        self.prefetch([n.text for n in narrations if matches_service(n.config, self)], cache_dir)
+
+    def submit(self, text: str, cache_dir: str = None, path: str = None, timeout: float = None):
+        """
+        Queues `generate_from_text` on the shared synthesis pool.
+        Blocks while the pool's queue is full.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the cache entry dict. Cancel it to drop the job.
+        """
+        return get_pool().submit(self.generate_from_text, text, cache_dir, path, timeout=timeout)
+
+    async def agenerate_from_text(self, text: str, cache_dir: str = None, path: str = None) -> dict:
+        """
+        Asyncio version of `generate_from_text`, run on the shared synthesis pool.
+        Waiting for a queue slot doesn't block the event loop, and cancelling the
+        awaiting task cancels the job if it hasn't started yet.
+        """
+        future = await get_pool().asubmit(self.generate_from_text, text, cache_dir, path)
+        return await future
 
     def generate_from_text(self, text: str, cache_dir: str = None, path: str = None) -> dict:
         if cache_dir is None:
             cache_dir = self.cache_dir
 
-        input_data = {"input_text": text, "service": "kokoro_self", "voice": self.voice, "lang": self.lang, "volume": self.volume}
+        input_data = self._input_data(text)
         cached_result = self.get_cached_result(input_data, cache_dir)
         if cached_result is not None:
             return cached_result
 
+        if self.draft and path is None:
+            return self._draft(text, input_data, cache_dir)
+        self._synthesize_drafts(cache_dir)
+
+        if path is None:
+            pending = self._prefetched.pop(self.get_data_hash(input_data), None)
+            if pending is not None and in_pool() and not pending.done():
+                # The prefetch may be queued behind this job; synthesize here and let it find the entry cached
+                pending = None
+            if pending is not None:
+                try:
+                    encoded, json_dict = pending.result()
+                    encoded.result()
+                    return json_dict
+                except Exception as e:
+                    print(f"⚠️  Prefetch failed, synthesizing in the foreground: {e}")
+
+        # Single flight: concurrent renders of the same project wait for the process
+        # that is already synthesizing this voiceover instead of duplicating the work
+        with voiceover_lock(cache_dir, self.get_data_hash(input_data)):
+            cached_result = self.get_cached_result(input_data, cache_dir)
+            if cached_result is not None:
+                return cached_result
+
+            if path is None:
+                json_dict = self._fetch_from_backends(input_data, cache_dir)
+                if json_dict is not None:
+                    return json_dict
+
+            return self._synthesize(text, input_data, cache_dir, path)
+
+    def _draft(self, text: str, input_data: dict, cache_dir: str) -> dict:
+        """
+        A cache entry for a silent placeholder as long as the narration is
+        predicted to be. The narration is queued in the drafts manifest, to be
+        synthesized by the next render without draft mode (or kokoro-mv-batch).
+        """
+        spoken = remove_bookmarks(text)
+        seconds = self._duration_model(cache_dir).predict(self._draft_phonemize(spoken), self.voice, self.lang, self.speed)
+        length = int(round(seconds * SAMPLE_RATE))
+        # A key of its own, so a placeholder never stands in for real audio
+        draft_data = dict(input_data, draft=length)
+        audio_path = self.get_data_hash(draft_data) + ".wav"
+        output_file = Path(cache_dir) / audio_path
+        if not output_file.exists():
+            write_audio(np.zeros(length, dtype=np.int16), SAMPLE_RATE, str(output_file))
+        queue_draft(cache_dir, {"text": text, "voice": self.voice, "lang": self.lang,
+                                "speed": float(self.speed), "volume": self.volume})
+        remember_duration(str(output_file), length / SAMPLE_RATE)
+        return {
+            "input_text": text,
+            "input_data": draft_data,
+            "original_audio": audio_path,
+            "word_boundaries": word_boundaries(chunk_words(spoken, None, length, SAMPLE_RATE), SAMPLE_RATE),
+            "metadata": audio_metadata(str(output_file), length, SAMPLE_RATE, "wav"),
+        }
+
+    def _draft_phonemize(self, text: str) -> str:
+        """`_phonemize` without loading the model; a standalone tokenizer phonemizes on a cache miss."""
+        def phonemize(text, lang):
+            tokenizer = self._kokoro.tokenizer if self._kokoro is not None else get_tokenizer()
+            return tokenizer.phonemize(text, lang)
+
+        if not self.phoneme_cache:
+            return phonemize(text, self.lang)
+        return get_phoneme_cache().phonemize(text, self.lang, phonemize)
+
+    def _duration_model(self, cache_dir: str) -> DurationModel:
+        """
+        The draft duration model of a cache directory. It is recalibrated for
+        this voice and language once per process when the cache holds narrations
+        it wasn't fitted on.
+        """
+        model = self._duration_models.get(cache_dir)
+        if model is not None:
+            return model
+        model = DurationModel.load(cache_dir)
+        index = open_index(cache_dir, self.max_cache_size)
+        index.import_json()
+        entries = [
+            entry for entry in index.entries()
+            if entry.get("input_data", {}).get("service") == "kokoro_self" and not entry["input_data"].get("draft")
+            and entry["input_data"].get("voice") == self.voice and entry["input_data"].get("lang") == self.lang
+        ]
+
+        def samples():
+            data = []
+            for entry in entries:
+                # Entries from before audio metadata was recorded need their file opened
+                seconds = entry.get("metadata", {}).get("duration")
+                if seconds is None:
+                    try:
+                        seconds = get_duration(str(Path(cache_dir) / entry["original_audio"]))
+                    except Exception:
+                        continue
+                speed = entry["input_data"].get("speed", 1.0)
+                data.append((self._draft_phonemize(remove_bookmarks(entry["input_text"])), seconds * speed))
+            return data
+
+        if model.calibrate(self.voice, self.lang, samples, len(entries)):
+            model.save(cache_dir)
+        self._duration_models[cache_dir] = model
+        return model
+
+    def _synthesize_drafts(self, cache_dir: str) -> None:
+        """
+        Synthesize, in shared batches, the narrations earlier draft renders with
+        these settings left unsynthesized. This runs on the calling thread, not
+        the synthesis pool: generate_from_text may itself be a pool job, and
+        waiting on jobs queued behind it could deadlock the pool.
+        """
+        if cache_dir in self._drafts_taken:
+            return
+        self._drafts_taken.add(cache_dir)
+        config = {"voice": self.voice, "lang": self.lang, "speed": float(self.speed), "volume": self.volume}
+        rows = take_drafts(cache_dir, lambda row: all(row.get(key) == value for key, value in config.items()))
+        if not rows:
+            return
+        print(f"🎤 Synthesizing {len(rows)} narrations from draft renders...")
+        group_size = max(1, self.batch_size)
+        for start in range(0, len(rows), group_size):
+            try:
+                self.synthesize_batch([row["text"] for row in rows[start:start + group_size]], cache_dir)
+            except Exception as e:
+                print(f"⚠️  Synthesizing draft narrations failed, they stay queued: {e}")
+                for row in rows[start:]:
+                    queue_draft(cache_dir, row)
+                return
+
+    def _fetch_from_backends(self, input_data: dict, cache_dir: str):
+        """Reuses a voiceover another project or render node already synthesized."""
+        data_hash = self.get_data_hash(input_data)
+        audio_path = data_hash + FORMATS[self.output_format][0]
+        for backend in self.cache_backends:
+            try:
+                json_dict = backend.fetch(data_hash, str(Path(cache_dir) / audio_path))
+            except (OSError, ValueError, KeyError, TypeError, http.client.HTTPException) as e:
+                # A failing or misbehaving backend is a miss; the voiceover is synthesized instead
+                print(f"⚠️  Cache backend {type(backend).__name__} failed: {e}")
+                continue
+            if json_dict is not None:
+                json_dict["original_audio"] = audio_path
+                self._describe(json_dict, cache_dir)
+                open_index(cache_dir, self.max_cache_size).record(data_hash, json_dict)
+                return json_dict
+        return None
+
+    def synthesize_batch(self, texts, cache_dir: str = None) -> list:
+        """
+        Synthesizes several narrations into the cache and returns their cache
+        entries, in order. The uncached ones are synthesized together, so their
+        chunks share padded batches through the model.
+        """
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+        texts = [" ".join(text.split()) for text in texts]
+        results = []
+        for encoded, json_dict in self._synthesize_many(texts, [self._input_data(text) for text in texts], cache_dir):
+            encoded.result()
+            results.append(json_dict)
+        return results
+
+    def _synthesize_many(self, texts, input_datas, cache_dir: str):
+        """
+        Pool job behind `prefetch` and `synthesize_batch`. Holds each voiceover's
+        lock until its entry is stored and returns (future, cache entry) per
+        text, the future being done once the entry is stored. Cached narrations
+        and cache backend hits aren't synthesized.
+        """
+        hashes = [self.get_data_hash(input_data) for input_data in input_datas]
+        entries = {}
+        held = {}
+        try:
+            missing = []
+            # Locks are taken in hash order, so concurrent jobs never wait on each other in a cycle
+            for data_hash in sorted(set(hashes)):
+                i = hashes.index(data_hash)
+                lock = voiceover_lock(cache_dir, data_hash)
+                lock.acquire()
+                held[data_hash] = lock
+                json_dict = self.get_cached_result(input_datas[i], cache_dir) or self._fetch_from_backends(input_datas[i], cache_dir)
+                if json_dict is not None:
+                    held.pop(data_hash).release()
+                    done = Future()
+                    done.set_result(None)
+                    entries[data_hash] = done, json_dict
+                else:
+                    missing.append(i)
+
+            missing.sort()
+            if self.engine == self.text_to_speech:
+                # Streamed narrations are synthesized on their own below
+                spoken = {i: remove_bookmarks(texts[i]) for i in missing}
+                batched = [i for i in missing if not self._streams(spoken[i])]
+                rendered = self._render_batch([spoken[i] for i in batched], self.voice, self.speed, self.lang,
+                                              self.volume, cache_dir)
+                for i, (samples, sample_rate, boundaries) in zip(batched, rendered):
+                    entries[hashes[i]] = self._encode(samples, sample_rate, texts[i], input_datas[i], cache_dir,
+                                                      wait=False, word_boundaries=boundaries)
+            for i in missing:
+                if hashes[i] not in entries:
+                    entries[hashes[i]] = self._synthesize(texts[i], input_datas[i], cache_dir, None, wait=False)
+            for i in missing:
+                lock = held.pop(hashes[i])
+                entries[hashes[i]][0].add_done_callback(lambda _, lock=lock: lock.release())
+        finally:
+            for lock in held.values():
+                lock.release()
+        return [entries[data_hash] for data_hash in hashes]
+
+    def _synthesize(self, text: str, input_data: dict, cache_dir: str, path: str = None, wait: bool = True):
+        """
+        Runs the engine for a cache miss and returns the cache entry.
+        Encoding happens on the background encoder thread; with wait=False the
+        caller gets (future, cache entry) back as soon as inference is done, so it
+        can start on the next narration while this one is encoded and recorded.
+        """
+        extension = FORMATS[self.output_format][0]
         if path is None:
-            audio_path = self.get_data_hash(input_data) + ".mp3"
+            audio_path = self.get_data_hash(input_data) + extension
         else:
             audio_path = path
 
-        # Generate .wav file using the text_to_speech function
-        audio_path_wav = str(Path(cache_dir) / audio_path.replace(".mp3", ".wav"))
-        self.engine(
-            text=text,
-            output_file=audio_path_wav,
-            voice_name=self.voice,
-            speed=self.speed,
-            lang=self.lang,
-            volume=self.volume,
-        )
+        # Bookmarks are placed with the word boundaries, not spoken
+        spoken = remove_bookmarks(text)
+        if self.engine == self.text_to_speech and self._streams(spoken):
+            # Long narration is encoded as it is synthesized instead of from one buffer
+            length, boundaries = self._stream_to_file(spoken, str(Path(cache_dir) / audio_path), self.voice,
+                                                      self.speed, self.lang, self.volume, cache_dir)
+            encoded = Future()
+            encoded.set_result(None)
+            return self._record(encoded, text, input_data, cache_dir, audio_path, wait, boundaries,
+                                length, SAMPLE_RATE)
+
+        boundaries = None
+        if self.engine == self.text_to_speech:
+            # The built-in engine hands its PCM buffer straight to the encoder
+            samples, sample_rate, boundaries = self._render(spoken, self.voice, self.speed, self.lang, self.volume,
+                                                            cache_dir)
+        else:
+            # Custom engines write a .wav file, which is read back, re-encoded and removed
+            audio_path_wav = str(Path(cache_dir) / (Path(audio_path).stem + ".engine.wav"))
+            self.engine(
+                text=spoken,
+                output_file=audio_path_wav,
+                voice_name=self.voice,
+                speed=self.speed,
+                lang=self.lang,
+                volume=self.volume,
+            )
+            sample_rate, samples = read_wav(audio_path_wav)
+            os.remove(audio_path_wav)
 
-        # Convert .wav to .mp3
-        mp3_audio_path = str(Path(cache_dir) / audio_path)
-        wav2mp3(audio_path_wav, mp3_audio_path)
+        return self._encode(samples, sample_rate, text, input_data, cache_dir, audio_path, wait, boundaries)
 
-        # Remove original .wav file
-        remove_bookmarks(audio_path_wav)
+    def _encode(self, samples, sample_rate, text: str, input_data: dict, cache_dir: str,
+                audio_path: str = None, wait: bool = True, word_boundaries: list = None):
+        """Encodes synthesized PCM into the cache and records it once written; see `_synthesize`."""
+        if audio_path is None:
+            audio_path = self.get_data_hash(input_data) + FORMATS[self.output_format][0]
+        output_file = str(Path(cache_dir) / audio_path)
+        encoded = encode_in_background(samples, sample_rate, output_file, self.output_format)
+        return self._record(encoded, text, input_data, cache_dir, audio_path, wait, word_boundaries,
+                            len(samples), sample_rate)
 
+    def _record(self, encoded: Future, text: str, input_data: dict, cache_dir: str, audio_path: str,
+                wait: bool = True, word_boundaries: list = None, sample_count: int = 0,
+                sample_rate: int = SAMPLE_RATE):
+        """
+        Stores the cache entry of a voiceover, with the metadata of its audio,
+        once its encode future is done. With wait=False, returns a future that
+        is done once the entry is stored; see `_synthesize`.
+        """
+        output_file = str(Path(cache_dir) / audio_path)
         json_dict = {
             "input_text": text,
             "input_data": input_data,
             "original_audio": audio_path,
         }
+        if word_boundaries is not None:
+            # Word timings from the model, for manim_voiceover's bookmarks (no transcription needed)
+            json_dict["word_boundaries"] = word_boundaries
+
+        def store():
+            # Recorded now, so cache hits never have to open the audio to learn about it
+            json_dict["metadata"] = audio_metadata(output_file, sample_count, sample_rate, self.output_format)
+            self._store_result(input_data, json_dict, cache_dir)
+            remember_duration(output_file, json_dict["metadata"]["duration"])
 
+        if not wait:
+            recorded = Future()
+
+            def finish(future):
+                try:
+                    future.result()
+                    store()
+                except BaseException as e:
+                    recorded.set_exception(e)
+                else:
+                    recorded.set_result(None)
+
+            encoded.add_done_callback(finish)
+            return recorded, json_dict
+        encoded.result()
+        store()
+        print(f"Saved at {output_file}")
         return json_dict
+
+    def _store_result(self, input_data: dict, json_dict: dict, cache_dir: str) -> None:
+        """Records a finished voiceover in the cache index and uploads it to the cache backends."""
+        data_hash = self.get_data_hash(input_data)
+        open_index(cache_dir, self.max_cache_size).record(data_hash, json_dict)
+        audio_file = str(Path(cache_dir) / json_dict["original_audio"])
+        for backend in self.cache_backends:
+            upload_in_background(backend, data_hash, audio_file, dict(json_dict))
@@ -0,0 +1,139 @@
+"""
+Cross-process locking for Kokoro Manim Voiceover
+Per-voiceover lock files, so concurrent renders of the same project synthesize
+each narration once and the others wait for the result.
+"""
+
+import os
+import time
+from pathlib import Path
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    An exclusive lock on a file, held across processes and threads.
+
+    The lock belongs to the open file rather than to a thread, so it may be
+    released from a different thread than the one that acquired it.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._fd = None
+
+    def acquire(self, blocking: bool = True, poll_interval: float = 0.1, create: bool = True) -> bool:
+        """
+        Take the lock, waiting for other holders if blocking. Returns whether it
+        was taken. Without create, a missing lock file raises FileNotFoundError.
+        """
+        if create:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            fd = os.open(str(self.path), os.O_RDWR | (os.O_CREAT if create else 0), 0o644)
+            try:
+                if os.name == "nt":
+                    while True:
+                        try:
+                            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                            break
+                        except OSError:
+                            if not blocking:
+                                raise
+                            time.sleep(poll_interval)
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                if not blocking:
+                    return False
+                raise
+            # A stale lock file removed while we waited guards nothing; lock the current one instead
+            if self._is_current(fd):
+                self._fd = fd
+                return True
+            os.close(fd)
+
+    def _is_current(self, fd: int) -> bool:
+        """Whether fd is still the file at self.path."""
+        try:
+            linked = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(fd)
+        return (linked.st_dev, linked.st_ino) == (opened.st_dev, opened.st_ino)
+
+    def release(self) -> None:
+        """Release the lock. Safe to call when it isn't held."""
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if os.name == "nt":
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+def voiceover_lock(cache_dir: str, data_hash: str) -> FileLock:
+    """The lock guarding synthesis of one voiceover in a cache directory."""
+    return FileLock(Path(cache_dir) / ".locks" / (data_hash + ".lock"))
+
+
+def is_locked(path: str) -> bool:
+    """Whether the lock file at path is held by anyone; a missing file is not held."""
+    lock = FileLock(path)
+    try:
+        if not lock.acquire(blocking=False, create=False):
+            return True
+    except FileNotFoundError:
+        return False
+    lock.release()
+    return False
+
+
+def remove_stale_locks(cache_dir: str, dry_run: bool = False) -> int:
+    """
+    Delete the lock files of a cache directory nobody holds. Returns how many
+    there were. Holders that had opened a file before it was removed notice
+    and lock its replacement instead.
+    """
+    locks_dir = Path(cache_dir) / ".locks"
+    if not locks_dir.is_dir():
+        return 0
+    removed = 0
+    for path in locks_dir.glob("*.lock"):
+        lock = FileLock(path)
+        try:
+            if not lock.acquire(blocking=False, create=False):
+                continue
+        except FileNotFoundError:
+            continue
+        try:
+            if not dry_run and os.name != "nt":
+                # Removed while held, so no one can take it in between
+                path.unlink()
+        finally:
+            lock.release()
+        if not dry_run and os.name == "nt":
+            # Windows can't delete an open file
+            try:
+                path.unlink()
+            except OSError:
+                continue
+        removed += 1
+    return removed
@@ -0,0 +1,101 @@
+"""
+Pre-optimized model artifacts for Kokoro Manim Voiceover
+Serializes the graph ONNX Runtime optimizes on every load, so later loads can
+skip the optimization passes. Artifacts are keyed by the onnxruntime version,
+the CPU features and the source model file, and rebuilt when any changes.
+"""
+
+import hashlib
+import os
+import platform
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# CPU flags that change which kernels and fusions ONNX Runtime picks
+_CPU_FLAGS = {
+    "sse4_1", "sse4_2", "avx", "avx2", "fma", "f16c", "avx512f", "avx512bw", "avx512vl",
+    "avx512_vnni", "avx512_bf16", "avx_vnni", "amx_tile", "amx_int8", "amx_bf16",
+    "asimd", "asimddp", "asimdhp", "fphp", "sve", "sve2", "i8mm", "bf16",
+}
+# Providers an artifact optimized for the CPU can run on
+_CPU_PROVIDERS = {"CPUExecutionProvider", "AzureExecutionProvider"}
+
+
+def cpu_features() -> str:
+    """A stable description of the CPU features relevant to ONNX Runtime."""
+    flags = set()
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name.strip() in ("flags", "Features"):
+                    flags.update(value.split())
+                    break
+    except OSError:
+        pass
+    described = sorted(flags & _CPU_FLAGS) or [platform.processor()]
+    return " ".join([platform.machine()] + described)
+
+
+def artifact_key(model_path: str) -> str:
+    """Key of the optimized artifact for a model on this machine and onnxruntime version."""
+    import onnxruntime as ort
+
+    stat = os.stat(model_path)
+    parts = [ort.__version__, cpu_features(), str(stat.st_size), str(stat.st_mtime_ns)]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def artifact_path(model_path: str) -> Path:
+    """Where the optimized artifact of a model lives: next to it, named by its key."""
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}.opt-{artifact_key(str(model_path))}.onnx")
+
+
+def optimize_model(model_path: str, force: bool = False) -> Path:
+    """
+    Write the optimized graph of a model next to it and remove stale artifacts.
+
+    Returns:
+        Path: The optimized model.
+    """
+    import onnxruntime as ort
+
+    target = artifact_path(model_path)
+    if target.exists() and not force:
+        return target
+
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.optimized_model_filepath = str(tmp)
+    try:
+        ort.InferenceSession(str(model_path), sess_options=options, providers=["CPUExecutionProvider"])
+        os.replace(tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    for stale in target.parent.glob(f"{Path(model_path).stem}.opt-*.onnx"):
+        if stale != target:
+            stale.unlink()
+    return target
+
+
+def optimized_model(model_path: str) -> Optional[str]:
+    """
+    The optimized artifact to load instead of a model, or None if there is no
+    valid one or the model will run on a non-CPU execution provider.
+    """
+    from .runtime import execution_providers
+
+    if os.getenv("KOKORO_MV_OPTIMIZED_MODEL", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    try:
+        if not set(execution_providers()) <= _CPU_PROVIDERS:
+            return None
+        target = artifact_path(model_path)
+    except (ImportError, OSError):
+        return None
+    return str(target) if target.is_file() else None
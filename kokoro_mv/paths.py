@@ -0,0 +1,18 @@
+"""
+Shared locations for Kokoro Manim Voiceover
+"""
+
+import os
+from pathlib import Path
+
+
+def user_cache_dir() -> Path:
+    """
+    Machine-wide cache directory, shared by every project of the current user.
+    Honours KOKORO_MV_CACHE_DIR, then XDG_CACHE_HOME, then ~/.cache.
+    """
+    override = os.getenv("KOKORO_MV_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base).expanduser() / "kokoro_mv"
@@ -0,0 +1,115 @@
+"""
+Phoneme cache for Kokoro Manim Voiceover
+Persists espeak phonemization results, so voice, speed and volume changes
+skip grapheme-to-phoneme conversion entirely.
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Optional
+
+from .paths import user_cache_dir
+
+
+def phonemizer_version() -> str:
+    """Identify the G2P stack, so cached phonemes are dropped when it changes."""
+    versions = []
+    for package in ("kokoro-onnx", "phonemizer-fork", "espeakng-loader"):
+        try:
+            versions.append(f"{package}=={metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            pass
+    return ";".join(versions)
+
+
+class PhonemeCache:
+    """
+    SQLite-backed map of (text, lang, phonemizer version) to phonemes,
+    fronted by a bounded in-memory LRU.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_memory_entries: int = 4096):
+        self.path = Path(path) if path else user_cache_dir() / "phonemes.sqlite"
+        self.max_memory_entries = max_memory_entries
+        self.version = phonemizer_version()
+        self._memory: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS phonemes ("
+                " version TEXT NOT NULL, lang TEXT NOT NULL, text TEXT NOT NULL,"
+                " phonemes TEXT NOT NULL, PRIMARY KEY (version, lang, text))"
+            )
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _remember(self, key: tuple, phonemes: str) -> None:
+        self._memory[key] = phonemes
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str, lang: str) -> Optional[str]:
+        """Return the cached phonemes for text, or None on a miss."""
+        key = (lang, text)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            try:
+                row = self._connect().execute(
+                    "SELECT phonemes FROM phonemes WHERE version = ? AND lang = ? AND text = ?",
+                    (self.version, lang, text),
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, text: str, lang: str, phonemes: str) -> None:
+        """Store phonemes in memory and on disk."""
+        with self._lock:
+            self._remember((lang, text), phonemes)
+            try:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO phonemes (version, lang, text, phonemes) VALUES (?, ?, ?, ?)",
+                    (self.version, lang, text, phonemes),
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                # The cache is an optimization; a read-only or locked disk must not break synthesis
+                print(f"⚠️  Could not write phoneme cache {self.path}: {e}")
+
+    def phonemize(self, text: str, lang: str, phonemize: Callable[[str, str], str]) -> str:
+        """Return cached phonemes, running `phonemize(text, lang)` only on a miss."""
+        phonemes = self.get(text, lang)
+        if phonemes is None:
+            phonemes = phonemize(text, lang)
+            self.put(text, lang, phonemes)
+        return phonemes
+
+
+_cache: Optional[PhonemeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_phoneme_cache() -> PhonemeCache:
+    """Return the process-wide phoneme cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PhonemeCache()
+        return _cache
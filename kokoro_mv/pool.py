@@ -0,0 +1,137 @@
+"""
+Synthesis worker pool for Kokoro Manim Voiceover
+A bounded, process-wide pool that runs synthesis jobs against the shared model.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+
+def _default_workers() -> int:
+    # ONNX Runtime already spreads a single inference over all cores, so a
+    # second worker is only there to overlap phonemization and encoding.
+    return min(2, os.cpu_count() or 1)
+
+
+# Marks the threads of synthesis pools
+_worker = threading.local()
+
+
+def _mark_worker() -> None:
+    _worker.active = True
+
+
+def in_pool() -> bool:
+    """Whether the calling thread is a synthesis pool worker, which must not wait on queued pool jobs."""
+    return getattr(_worker, "active", False)
+
+
+def _wake(waiter: "asyncio.Future") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class SynthesisPool:
+    """
+    Runs synthesis jobs on a fixed number of threads with a bounded queue.
+
+    At most `max_workers` jobs run at once, and at most `max_pending` jobs are
+    queued or running. `submit` blocks and `asubmit` awaits while the queue is
+    full, which gives callers backpressure instead of an unbounded backlog.
+    Jobs that have not started yet can be cancelled through their future.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.max_workers = max_workers or _default_workers()
+        self.max_pending = max(max_pending or 8 * self.max_workers, self.max_workers)
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="kokoro-synth",
+                                            initializer=_mark_worker)
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._pending = 0
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs queued or running."""
+        return self._pending
+
+    def submit(self, fn: Callable, *args, block: bool = True,
+               timeout: Optional[float] = None, **kwargs) -> Future:
+        """
+        Queue a job and return its future.
+
+        Parameters:
+            block (bool): Wait for a free slot when the queue is full.
+            timeout (float): Maximum seconds to wait for a slot.
+
+        Raises:
+            TimeoutError: If no slot became free (or block is False and the queue is full).
+        """
+        with self._not_full:
+            if not block:
+                timeout = 0
+            if not self._not_full.wait_for(lambda: self._pending < self.max_pending, timeout):
+                raise TimeoutError("The synthesis queue is full.")
+            self._pending += 1
+        return self._start(fn, *args, **kwargs)
+
+    async def asubmit(self, fn: Callable, *args, **kwargs) -> "asyncio.Future":
+        """Queue a job without blocking the event loop and return an awaitable future."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._pending < self.max_pending:
+                    self._pending += 1
+                    break
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+        return asyncio.wrap_future(self._start(fn, *args, **kwargs), loop=loop)
+
+    def _start(self, fn: Callable, *args, **kwargs) -> Future:
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future: Optional[Future]) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._not_full.notify()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+_pool: Optional[SynthesisPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SynthesisPool:
+    """Return the process-wide synthesis pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SynthesisPool()
+        return _pool
+
+
+def configure_pool(max_workers: Optional[int] = None, max_pending: Optional[int] = None) -> SynthesisPool:
+    """Replace the process-wide pool. Jobs already queued on the old pool still complete."""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, SynthesisPool(max_workers, max_pending)
+    if old is not None:
+        old.shutdown(wait=False)
+    return _pool
@@ -0,0 +1,208 @@
+"""
+Audio post-processing for Kokoro Manim Voiceover
+A chain of stages applied in place to float32 synthesis output before it is
+quantized to 16-bit PCM. Consecutive gain stages are folded into a single
+multiply, so the chain makes a few passes over the buffer and allocates only
+the int16 output.
+"""
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Samples scanned at a time when searching for the edges of silence
+_SCAN_BLOCK = 4096
+
+
+def peak(buffer: np.ndarray) -> float:
+    """Largest absolute sample value, without allocating an abs() copy."""
+    if not len(buffer):
+        return 0.0
+    return float(max(buffer.max(), -buffer.min()))
+
+
+class Stage:
+    """
+    One post-processing step. Gain stages return a scale factor from `scale`;
+    other stages modify the buffer in place in `apply` and may return a view.
+    """
+
+    def scale(self, buffer: np.ndarray, sample_rate: int) -> Optional[float]:
+        """The factor this stage multiplies the buffer by, or None if it isn't a gain stage."""
+        return None
+
+    def apply(self, buffer: np.ndarray, sample_rate: int) -> np.ndarray:
+        return buffer
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"{type(self).__name__}({args})"
+
+
+class PeakNormalize(Stage):
+    """Scale so the loudest sample reaches `target` (1.0 is full scale)."""
+
+    def __init__(self, target: float = 1.0):
+        self.target = float(target)
+
+    def scale(self, buffer, sample_rate):
+        value = peak(buffer)
+        return self.target / value if value > 0 else 1.0
+
+
+class LoudnessNormalize(Stage):
+    """Scale to an RMS level of `target_dbfs`; pair with clipping or a limiter for loud targets."""
+
+    def __init__(self, target_dbfs: float = -20.0):
+        self.target_dbfs = float(target_dbfs)
+
+    def scale(self, buffer, sample_rate):
+        if not len(buffer):
+            return 1.0
+        rms = float(np.sqrt(np.dot(buffer, buffer) / len(buffer)))
+        return 10 ** (self.target_dbfs / 20) / rms if rms > 0 else 1.0
+
+
+class Gain(Stage):
+    """Multiply by a fixed gain; invalid gains fall back to 1.0."""
+
+    def __init__(self, gain: float = 1.0):
+        try:
+            gain = float(gain)
+        except (TypeError, ValueError):
+            gain = 1.0
+        self.gain = gain if np.isfinite(gain) else 1.0
+
+    def scale(self, buffer, sample_rate):
+        return self.gain
+
+
+class TrimSilence(Stage):
+    """Drop leading and trailing audio below `threshold_db`, keeping `pad_ms` around the speech."""
+
+    def __init__(self, threshold_db: float = -50.0, pad_ms: float = 20.0):
+        self.threshold_db = float(threshold_db)
+        self.pad_ms = float(pad_ms)
+
+    @staticmethod
+    def _first_loud(buffer: np.ndarray, threshold: float, reverse: bool = False) -> Optional[int]:
+        n = len(buffer)
+        starts = range(0, n, _SCAN_BLOCK)
+        for start in (reversed(starts) if reverse else starts):
+            block = buffer[start:start + _SCAN_BLOCK]
+            if block.max() > threshold or -block.min() > threshold:
+                loud = np.flatnonzero((block > threshold) | (block < -threshold))
+                return start + int(loud[-1] if reverse else loud[0])
+        return None
+
+    def apply(self, buffer, sample_rate):
+        threshold = peak(buffer) * 10 ** (self.threshold_db / 20)
+        first = self._first_loud(buffer, threshold)
+        if first is None:
+            return buffer[:0]
+        last = self._first_loud(buffer, threshold, reverse=True)
+        pad = int(sample_rate * self.pad_ms / 1000)
+        return buffer[max(0, first - pad):min(len(buffer), last + 1 + pad)]
+
+
+class Fade(Stage):
+    """Linear fade in and out over `in_ms` and `out_ms`."""
+
+    def __init__(self, in_ms: float = 5.0, out_ms: float = 10.0):
+        self.in_ms = float(in_ms)
+        self.out_ms = float(out_ms)
+
+    def apply(self, buffer, sample_rate):
+        n_in = min(len(buffer), int(sample_rate * self.in_ms / 1000))
+        n_out = min(len(buffer), int(sample_rate * self.out_ms / 1000))
+        if n_in:
+            buffer[:n_in] *= np.linspace(0.0, 1.0, n_in, dtype=np.float32)
+        if n_out:
+            buffer[len(buffer) - n_out:] *= np.linspace(1.0, 0.0, n_out, dtype=np.float32)
+        return buffer
+
+
+class PostProcessor:
+    """
+    Runs stages over a float32 buffer in place and quantizes the result into
+    an int16 array, with clipping. The default chain is the peak normalization
+    KokoroService always applied.
+    """
+
+    def __init__(self, stages: Optional[Sequence[Stage]] = None):
+        self.stages: List[Stage] = list(stages) if stages is not None else [PeakNormalize()]
+
+    def __repr__(self) -> str:
+        return f"PostProcessor({self.stages!r})"
+
+    def _prepare(self, samples: np.ndarray, sample_rate: int, gain: float):
+        """
+        Run the stages; returns the buffer, the gain still to apply to it and
+        where the buffer starts in the samples, which moves when a stage trims.
+        """
+        buffer = samples
+        if buffer.dtype != np.float32 or not buffer.flags.writeable or not buffer.flags.c_contiguous:
+            buffer = np.array(samples, dtype=np.float32)
+        origin = buffer.__array_interface__["data"][0]
+
+        factor = 1.0
+        for stage in self.stages + [Gain(gain)]:
+            scale = stage.scale(buffer, sample_rate)
+            if scale is not None:
+                factor *= scale
+                continue
+            if factor != 1.0:
+                buffer *= np.float32(factor)
+                factor = 1.0
+            buffer = stage.apply(buffer, sample_rate)
+
+        start = 0
+        if len(buffer) and np.may_share_memory(buffer, samples):
+            start = (buffer.__array_interface__["data"][0] - origin) // buffer.itemsize
+        return buffer, factor, start
+
+    @staticmethod
+    def _quantize(buffer: np.ndarray, factor: float, out: np.ndarray) -> np.ndarray:
+        # Scale straight into the int16 range, clip, and truncate like astype() did
+        buffer *= np.float32(factor * 32767)
+        np.clip(buffer, -32767.0, 32767.0, out=buffer)
+        out = out[:len(buffer)]
+        np.copyto(out, buffer, casting="unsafe")
+        return out
+
+    def process(self, samples: np.ndarray, sample_rate: int, gain: float = 1.0,
+                out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Post-process samples and return 16-bit PCM. A writable float32 input
+        is used as scratch space and overwritten; anything else is copied once.
+
+        Parameters:
+            gain (float): Extra gain after the stages, e.g. the service volume.
+            out (np.ndarray): Preallocated int16 output at least as long as the result.
+        """
+        return self.process_span(samples, sample_rate, gain, out)[0]
+
+    def process_span(self, samples: np.ndarray, sample_rate: int, gain: float = 1.0,
+                     out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, int]:
+        """`process` that also returns the sample of the input the output starts at."""
+        buffer, factor, start = self._prepare(samples, sample_rate, gain)
+        if out is None:
+            out = np.empty(len(buffer), dtype=np.int16)
+        return self._quantize(buffer, factor, out), start
+
+    def process_blocks(self, samples: np.ndarray, sample_rate: int, gain: float = 1.0,
+                       block_size: int = 1 << 16) -> Tuple[Iterator[np.ndarray], int]:
+        """
+        `process_span` for buffers that don't fit in memory, such as a writable
+        np.memmap: the stages see the whole buffer, but quantization happens
+        block by block into one reused int16 block, which the returned iterator
+        yields each time.
+        """
+        buffer, factor, start = self._prepare(samples, sample_rate, gain)
+
+        def blocks():
+            out = np.empty(min(block_size, len(buffer)), dtype=np.int16)
+            for begin in range(0, len(buffer), block_size):
+                yield self._quantize(buffer[begin:begin + block_size], factor, out)
+
+        return blocks(), start
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Narration prefetching for Kokoro Manim Voiceover
+Statically scans scene files for voiceover text and synthesizes it ahead of rendering.
+"""
+
+import argparse
+import ast
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+
+# KokoroService arguments that affect the synthesized audio, with their defaults
+CONFIG_DEFAULTS = {"voice": "", "lang": "en-us", "speed": 1.0, "volume": 1.0, "output_format": "mp3"}
+# Passed through when given; precision otherwise follows KOKORO_MV_PRECISION like in the scene
+CONFIG_KEYS = tuple(CONFIG_DEFAULTS) + ("model_path", "voices_path", "precision")
+
+_MISSING = object()
+
+
+class Narration(NamedTuple):
+    """A literal voiceover text found in a scene and the service config active for it."""
+    text: str
+    config: Dict[str, Any]
+    lineno: int
+
+
+def _call_name(func: ast.AST) -> str:
+    """Return the bare name of a called function or method."""
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return ""
+
+
+def _literal(node: ast.AST) -> Any:
+    """Evaluate a literal expression node, or return _MISSING if it isn't one."""
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return _MISSING
+
+
+def scan_scene(path: str) -> List[Narration]:
+    """
+    Collect the literal `voiceover(text=...)` narrations of a scene file.
+
+    Each narration is paired with the literal arguments of the closest
+    `KokoroService(...)` call that precedes it in the source. Texts built at
+    runtime (f-strings, variables) are skipped.
+    """
+    source = Path(path).read_text(encoding="utf-8")
+    tree = ast.parse(source, filename=str(path))
+    calls = sorted(
+        (node for node in ast.walk(tree) if isinstance(node, ast.Call)),
+        key=lambda node: (node.lineno, node.col_offset),
+    )
+
+    config = dict(CONFIG_DEFAULTS)
+    narrations = []
+    for call in calls:
+        name = _call_name(call.func)
+        if name == "KokoroService":
+            config = dict(CONFIG_DEFAULTS)
+            for keyword in call.keywords:
+                if keyword.arg in CONFIG_KEYS:
+                    value = _literal(keyword.value)
+                    if value is not _MISSING:
+                        config[keyword.arg] = value
+        elif name == "voiceover":
+            text_node = next((kw.value for kw in call.keywords if kw.arg == "text"), None)
+            if text_node is None and call.args:
+                text_node = call.args[0]
+            text = _literal(text_node) if text_node is not None else _MISSING
+            if isinstance(text, str) and text.strip():
+                narrations.append(Narration(" ".join(text.split()), dict(config), call.lineno))
+    return narrations
+
+
+def matches_service(config: Dict[str, Any], service) -> bool:
+    """Check whether a scanned config produces the same audio as a service instance."""
+    if config.get("precision", service.precision) != service.precision:
+        return False
+    return all(config.get(key, default) == getattr(service, key)
+               for key, default in CONFIG_DEFAULTS.items())
+
+
+def prefetch_file(scene_file: str, cache_dir: str = None) -> int:
+    """
+    Synthesize every literal narration of a scene file into the voiceover cache.
+
+    Returns:
+        int: The number of narrations that had to be synthesized.
+    """
+    from manim_voiceover.defaults import DEFAULT_VOICEOVER_CACHE_JSON_FILENAME
+    from manim_voiceover.helper import append_to_json_file
+
+    from .koko import KokoroService
+
+    narrations = scan_scene(scene_file)
+    if not narrations:
+        print(f"🔍 No literal voiceover text found in {scene_file}")
+        return 0
+
+    groups: Dict[tuple, List[str]] = {}
+    for narration in narrations:
+        key = tuple(sorted(narration.config.items()))
+        groups.setdefault(key, [])
+        if narration.text not in groups[key]:
+            groups[key].append(narration.text)
+
+    synthesized = 0
+    for key, texts in groups.items():
+        kwargs = dict(key)
+        if cache_dir is not None:
+            kwargs["cache_dir"] = Path(cache_dir)
+        service = KokoroService(**kwargs)
+        json_path = Path(service.cache_dir) / DEFAULT_VOICEOVER_CACHE_JSON_FILENAME
+        pending = [text for text in texts
+                   if service.get_cached_result(service._input_data(text), Path(service.cache_dir)) is None]
+        # A group at a time, so the chunks of several narrations share padded batches through the model
+        group_size = max(1, service.batch_size)
+        for start in range(0, len(pending), group_size):
+            group = pending[start:start + group_size]
+            for text in group:
+                print(f"🎤 [{service.voice or 'default'}/{service.lang}] {text[:60]}")
+            for result in service.synthesize_batch(group, cache_dir=Path(service.cache_dir)):
+                result["final_audio"] = result["original_audio"]
+                append_to_json_file(json_path, result)
+            synthesized += len(group)
+
+    print(f"✅ {synthesized} of {len(narrations)} narrations synthesized, the rest were cached.")
+    return synthesized
+
+
+def main():
+    """Main function for the prefetch script."""
+    parser = argparse.ArgumentParser(
+        prog="kokoro-mv-prefetch",
+        description="Synthesize the narration of a Manim scene into the voiceover cache before rendering.",
+    )
+    parser.add_argument("scene", help="Path to the scene file")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Voiceover cache directory (defaults to Manim's media/voiceovers)")
+    args = parser.parse_args()
+
+    try:
+        prefetch_file(args.scene, args.cache_dir)
+    except KeyboardInterrupt:
+        print(f"\n\n⏹️  Prefetch interrupted by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Prefetch failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
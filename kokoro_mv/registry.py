@@ -0,0 +1,136 @@
+"""
+Shared model registry for Kokoro Manim Voiceover
+Keeps a single loaded Kokoro model (and ONNX Runtime session) per process.
+"""
+
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+from .runtime import build_session_options, execution_providers
+from .voices import install_voice_store
+
+if TYPE_CHECKING:
+    from kokoro_onnx import Kokoro
+
+
+ModelKey = Tuple[str, str, Hashable]
+
+
+def _freeze(options: Optional[Dict[str, Any]]) -> Hashable:
+    """Turn a session options dict into a hashable, order-independent key part."""
+    if not options:
+        return ()
+    return tuple(sorted((str(k), repr(v)) for k, v in options.items()))
+
+
+def _load_model(model_path: str, voices_path: str,
+                session_options: Optional[Dict[str, Any]] = None) -> "Kokoro":
+    """Load a Kokoro model, applying ONNX Runtime session options if given."""
+    # Imported here so fully cached renders never load onnxruntime
+    from kokoro_onnx import Kokoro
+
+    if not session_options:
+        kokoro = Kokoro(model_path, voices_path)
+    else:
+        import onnxruntime as ort
+
+        session = ort.InferenceSession(
+            model_path,
+            sess_options=build_session_options(session_options),
+            providers=execution_providers(),
+        )
+        kokoro = Kokoro.from_session(session, voices_path)
+    # Map voices on demand instead of keeping the whole pack per process
+    install_voice_store(kokoro, voices_path)
+    return kokoro
+
+
+class _Entry:
+    __slots__ = ("kokoro", "refs")
+
+    def __init__(self, kokoro: "Kokoro"):
+        self.kokoro = kokoro
+        self.refs = 0
+
+
+class ModelRegistry:
+    """
+    Reference-counted cache of loaded Kokoro models.
+
+    Models are keyed by the resolved model path, voices path and session options,
+    so every KokoroService in a process that uses the same files shares one model.
+    Released models stay loaded until `evict` is called, which lets consecutive
+    scenes reuse them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[ModelKey, _Entry] = {}
+
+    @staticmethod
+    def make_key(model_path: str, voices_path: str,
+                 session_options: Optional[Dict[str, Any]] = None) -> ModelKey:
+        """Build the registry key for a model/voices/options combination."""
+        return (
+            os.path.realpath(model_path),
+            os.path.realpath(voices_path),
+            _freeze(session_options),
+        )
+
+    def acquire(self, model_path: str, voices_path: str,
+                session_options: Optional[Dict[str, Any]] = None) -> Tuple[ModelKey, "Kokoro"]:
+        """Return a shared model, loading it on first use, and take a reference to it."""
+        key = self.make_key(model_path, voices_path, session_options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(_load_model(model_path, voices_path, session_options))
+                self._entries[key] = entry
+            entry.refs += 1
+            return key, entry.kokoro
+
+    def release(self, key: ModelKey) -> None:
+        """Drop a reference taken with `acquire`. The model stays loaded until evicted."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+
+    def evict(self, key: Optional[ModelKey] = None, force: bool = False) -> int:
+        """
+        Unload models that are no longer referenced.
+
+        Parameters:
+            key (tuple): Only consider this model. All models are considered if None.
+            force (bool): Also unload models that are still referenced.
+
+        Returns:
+            int: The number of models unloaded.
+        """
+        with self._lock:
+            keys = [key] if key is not None else list(self._entries)
+            evicted = 0
+            for k in keys:
+                entry = self._entries.get(k)
+                if entry is None or (entry.refs > 0 and not force):
+                    continue
+                del self._entries[k]
+                evicted += 1
+            return evicted
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Describe the loaded models and their reference counts."""
+        with self._lock:
+            return [
+                {"model_path": k[0], "voices_path": k[1], "options": k[2], "refs": e.refs}
+                for k, e in self._entries.items()
+            ]
+
+
+registry = ModelRegistry()
+
+
+def evict_models(force: bool = False) -> int:
+    """Unload every shared model that is no longer referenced (or all of them if force)."""
+    return registry.evict(force=force)
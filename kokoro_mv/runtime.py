@@ -0,0 +1,143 @@
+"""
+ONNX Runtime configuration for Kokoro Manim Voiceover
+Session options (threads, graph optimization, execution mode, memory arena)
+taken from KokoroService arguments and environment variables.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Union
+
+# Accepted graph_optimization values and the onnxruntime.GraphOptimizationLevel they stand for
+OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+# Accepted execution_mode values and the onnxruntime.ExecutionMode they stand for
+EXECUTION_MODES = {"sequential": "ORT_SEQUENTIAL", "parallel": "ORT_PARALLEL"}
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+
+def available_cores() -> int:
+    """CPU cores this process may run on (respecting affinity masks and cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def auto_threads(workers: Optional[int] = None) -> int:
+    """
+    Intra-op threads per process when `workers` synthesizing processes share the
+    machine. Defaults to the KOKORO_MV_WORKERS environment variable, or 1.
+    """
+    if workers is None:
+        workers = int(os.getenv("KOKORO_MV_WORKERS", "1") or 1)
+    return max(1, available_cores() // max(1, workers))
+
+
+def _threads(value: Union[int, str, None], name: str) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if str(value).lower() == "auto":
+        return auto_threads()
+    try:
+        threads = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number of threads or 'auto', got {value!r}") from None
+    if threads < 0:
+        raise ValueError(f"{name} must not be negative, got {threads}")
+    return threads
+
+
+def _choice(value: Optional[str], choices: Dict[str, str], name: str) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        # An onnxruntime enum passed through as is
+        return value
+    if value.lower() not in choices:
+        raise ValueError(f"{name} must be one of {sorted(choices)}, got {value!r}")
+    return value.lower()
+
+
+def _flag(value: Union[bool, str, None], name: str) -> Optional[bool]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in _TRUE:
+        return True
+    if str(value).lower() in _FALSE:
+        return False
+    raise ValueError(f"{name} must be a boolean, got {value!r}")
+
+
+def session_config(intra_op_threads: Union[int, str, None] = None, inter_op_threads: Union[int, str, None] = None,
+                   graph_optimization: Optional[str] = None, execution_mode: Optional[str] = None,
+                   memory_arena: Union[bool, str, None] = None,
+                   session_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Collect ONNX Runtime session options as a dict of `onnxruntime.SessionOptions`
+    attribute names. Arguments win over `session_options`, which wins over the
+    KOKORO_MV_INTRA_OP_THREADS, KOKORO_MV_INTER_OP_THREADS, KOKORO_MV_GRAPH_OPTIMIZATION,
+    KOKORO_MV_EXECUTION_MODE and KOKORO_MV_MEMORY_ARENA environment variables.
+    Unset options keep onnxruntime's defaults.
+
+    Parameters:
+        intra_op_threads: Threads per operator, or "auto" to split the cores
+            between KOKORO_MV_WORKERS concurrent processes.
+        inter_op_threads: Threads running independent operators (parallel execution mode only).
+        graph_optimization: "disable", "basic", "extended" or "all".
+        execution_mode: "sequential" or "parallel".
+        memory_arena: Whether the CPU memory arena is enabled.
+    """
+    env = os.getenv
+    options = {
+        "intra_op_num_threads": _threads(env("KOKORO_MV_INTRA_OP_THREADS"), "KOKORO_MV_INTRA_OP_THREADS"),
+        "inter_op_num_threads": _threads(env("KOKORO_MV_INTER_OP_THREADS"), "KOKORO_MV_INTER_OP_THREADS"),
+        "graph_optimization_level": _choice(env("KOKORO_MV_GRAPH_OPTIMIZATION"), OPTIMIZATION_LEVELS,
+                                            "KOKORO_MV_GRAPH_OPTIMIZATION"),
+        "execution_mode": _choice(env("KOKORO_MV_EXECUTION_MODE"), EXECUTION_MODES, "KOKORO_MV_EXECUTION_MODE"),
+        "enable_cpu_mem_arena": _flag(env("KOKORO_MV_MEMORY_ARENA"), "KOKORO_MV_MEMORY_ARENA"),
+    }
+    options.update(session_options or {})
+    arguments = {
+        "intra_op_num_threads": _threads(intra_op_threads, "intra_op_threads"),
+        "inter_op_num_threads": _threads(inter_op_threads, "inter_op_threads"),
+        "graph_optimization_level": _choice(graph_optimization, OPTIMIZATION_LEVELS, "graph_optimization"),
+        "execution_mode": _choice(execution_mode, EXECUTION_MODES, "execution_mode"),
+        "enable_cpu_mem_arena": _flag(memory_arena, "memory_arena"),
+    }
+    options.update((name, value) for name, value in arguments.items() if value is not None)
+    return {name: value for name, value in options.items() if value is not None}
+
+
+def build_session_options(options: Dict[str, Any]):
+    """Create an `onnxruntime.SessionOptions` from a `session_config` dict."""
+    import onnxruntime as ort
+
+    sess_options = ort.SessionOptions()
+    for name, value in options.items():
+        if name == "graph_optimization_level" and isinstance(value, str):
+            value = getattr(ort.GraphOptimizationLevel, OPTIMIZATION_LEVELS[value])
+        elif name == "execution_mode" and isinstance(value, str):
+            value = getattr(ort.ExecutionMode, EXECUTION_MODES[value])
+        setattr(sess_options, name, value)
+    return sess_options
+
+
+def execution_providers() -> List[str]:
+    """
+    The providers kokoro_onnx would load the model on: ONNX_PROVIDER if set,
+    every available provider with an accelerated onnxruntime, else CPU only.
+    """
+    try:
+        from kokoro_onnx.session import resolve_providers
+    except ImportError:
+        # Older kokoro_onnx (e.g. 0.4.9) picks them in Kokoro.__init__: ONNX_PROVIDER, else CPU
+        provider = os.getenv("ONNX_PROVIDER")
+        return [provider] if provider else ["CPUExecutionProvider"]
+    return resolve_providers()
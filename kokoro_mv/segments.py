@@ -0,0 +1,110 @@
+"""
+Sentence-level audio cache for Kokoro Manim Voiceover
+Stores the raw model output of every synthesized sentence, so editing one
+sentence of a voiceover only re-synthesizes that sentence.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class SegmentCache:
+    """
+    Directory of float32 sentence audio keyed by text and synthesis settings.
+
+    Segments are stored before normalization and volume are applied, so the
+    same sentence is reused across voiceovers with different volumes.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(text: str, voice: str, lang: str, speed: float, precision: str = "fp32") -> str:
+        """Hash a sentence together with the settings that shape its audio."""
+        data = {"text": text, "voice": voice, "lang": lang, "speed": float(speed), "service": "kokoro_self"}
+        if precision != "fp32":
+            data["precision"] = precision
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str = ".npy") -> Path:
+        return self.directory / key[:2] / (key + suffix)
+
+    def load(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached audio for a key, or None on a miss."""
+        try:
+            return np.load(self._path(key))
+        except (OSError, ValueError):
+            return None
+
+    def load_words(self, key: str) -> Optional[list]:
+        """Return the word timings stored with a segment, or None if there are none."""
+        try:
+            with open(self._path(key, ".words.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, audio: np.ndarray, words: Optional[list] = None) -> int:
+        """
+        Write a segment (and its word timings) atomically, so readers never see a partial file.
+
+        Returns:
+            int: The bytes the segment takes on disk.
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = 0
+        if words is not None:
+            size += self._write(self._path(key, ".words.json"), json.dumps(words, ensure_ascii=False).encode("utf-8"))
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.asarray(audio, dtype=np.float32))
+                size += f.tell()
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return size
+
+    def remove(self, key: str) -> int:
+        """Delete a segment and its word timings; returns the bytes freed."""
+        freed = 0
+        for path in (self._path(key), self._path(key, ".words.json")):
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                freed += size
+            except FileNotFoundError:
+                pass
+        return freed
+
+    def sizes(self) -> Dict[str, int]:
+        """Bytes on disk of every stored segment, by key."""
+        sizes: Dict[str, int] = {}
+        if not self.directory.is_dir():
+            return sizes
+        for path in self.directory.glob("*/*"):
+            key = path.name.split(".", 1)[0]
+            if path.name.endswith((".npy", ".words.json")) and len(key) == 64:
+                sizes[key] = sizes.get(key, 0) + path.stat().st_size
+        return sizes
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> int:
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return len(data)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Synthesis daemon for Kokoro Manim Voiceover
+Keeps the Kokoro model loaded between renders and serves synthesis requests
+over localhost HTTP or a Unix socket (kokoro-mv-serve), plus the client that
+KokoroService(server=...) uses to reach it.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from .timing import Word
+
+
+DEFAULT_ADDRESS = "http://127.0.0.1:8765"
+
+
+def _parse_address(address: str) -> Tuple[str, str, int]:
+    """Return ("unix", path, 0) or ("tcp", host, port) for a server address."""
+    if address.startswith("unix://"):
+        return "unix", address[len("unix://"):], 0
+    if address.startswith("/") or address.endswith(".sock"):
+        return "unix", address, 0
+    url = urlparse(address if "://" in address else "http://" + address)
+    return "tcp", url.hostname or "127.0.0.1", url.port or 8765
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+class SynthesisClient:
+    """
+    Client for a kokoro-mv-serve daemon.
+
+    After a connection failure the daemon is considered unavailable for
+    `retry_after` seconds, so callers fall back to in-process synthesis
+    without paying a connection timeout on every voiceover.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: float = 600.0, retry_after: float = 30.0):
+        self.address = address
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._kind, self._host, self._port = _parse_address(address)
+        self._unavailable_until = 0.0
+
+    def _connection(self, timeout: float) -> http.client.HTTPConnection:
+        if self._kind == "unix":
+            return _UnixHTTPConnection(self._host, timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=timeout)
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    def synthesize(self, text: str, voice: str, speed: float, lang: str,
+                   precision: str = "fp32") -> Tuple[np.ndarray, int, Optional[List[Word]]]:
+        """
+        Synthesize on the daemon and return the float32 samples, before
+        post-processing, the sample rate and the word timings. The timings are
+        None from a daemon too old to send them.
+
+        Raises:
+            ConnectionError: If the daemon can't be reached or failed.
+        """
+        if not self.available:
+            raise ConnectionError(f"Synthesis server {self.address} is unavailable")
+        body = json.dumps({"text": text, "voice": voice, "speed": speed, "lang": lang, "precision": precision})
+        connection = self._connection(self.timeout)
+        try:
+            connection.request("POST", "/synthesize", body.encode("utf-8"), {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = response.read()
+        except OSError as e:
+            self._unavailable_until = time.monotonic() + self.retry_after
+            raise ConnectionError(f"Synthesis server {self.address} is unavailable: {e}") from e
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise ConnectionError(f"Synthesis server error {response.status}: {payload.decode(errors='replace')}")
+        sample_rate = int(response.getheader("X-Sample-Rate"))
+        # The body is the word timings as JSON, X-Words-Length bytes of it, then the samples
+        words_length = int(response.getheader("X-Words-Length") or 0)
+        words = [Word(*word) for word in json.loads(payload[:words_length])] if words_length else None
+        return np.frombuffer(payload[words_length:], dtype="<f4").astype(np.float32), sample_rate, words
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "kokoro-mv-serve"
+
+    def _reply(self, status: int, body: bytes, content_type: str, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._reply(404, b"Not found", "text/plain")
+            return
+        self._reply(200, json.dumps({"status": "ok"}).encode("utf-8"), "application/json")
+
+    def do_POST(self):
+        if self.path != "/synthesize":
+            self._reply(404, b"Not found", "text/plain")
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            with self.server.slots:
+                service = self.server.service_for(request.get("precision", "fp32"))
+                samples, sample_rate, words = service.synthesize_samples(
+                    request["text"], request["voice"], float(request["speed"]), request["lang"],
+                )
+        except Exception as e:
+            self._reply(500, str(e).encode("utf-8"), "text/plain")
+            return
+        # Word timings can outgrow a header line, so they go in front of the samples
+        words = json.dumps([list(word) for word in words], ensure_ascii=False).encode("utf-8")
+        self._reply(200, words + np.ascontiguousarray(samples, dtype="<f4").tobytes(), "application/octet-stream",
+                    {"X-Sample-Rate": str(sample_rate), "X-Words-Length": str(len(words))})
+
+    def log_message(self, format, *args):
+        print(f"🎤 {format % args}")
+
+
+class _Services:
+    """The daemon's services, one per model precision, created on first request."""
+
+    def __init__(self, model_path: str, voices_path: str):
+        from .paths import user_cache_dir
+
+        self.model_path = model_path
+        self.voices_path = voices_path
+        # The daemon keeps its own sentence segment cache, shared by every client
+        self.cache_dir = str(user_cache_dir() / "server")
+        self._services = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, precision: str):
+        from .koko import KokoroService
+
+        with self._lock:
+            service = self._services.get(precision)
+            if service is None:
+                service = KokoroService(model_path=self.model_path, voices_path=self.voices_path, server=False,
+                                        precision=precision, cache_dir=self.cache_dir)
+                self._services[precision] = service
+            return service
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("local", 0)
+
+
+def serve(address: str = DEFAULT_ADDRESS, model_path: str = "", voices_path: str = "",
+          workers: int = 2) -> None:
+    """Load the model once and serve synthesis requests until interrupted."""
+    services = _Services(model_path, voices_path)
+    print("📦 Loading model...")
+    services(os.getenv("KOKORO_MV_PRECISION") or "fp32").kokoro
+
+    kind, host, port = _parse_address(address)
+    if kind == "unix":
+        if os.path.exists(host):
+            os.unlink(host)
+        httpd = _UnixHTTPServer(host, _Handler)
+    else:
+        httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.service_for = services
+    httpd.slots = threading.BoundedSemaphore(workers)
+    print(f"🚀 Serving Kokoro synthesis on {address}")
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        if kind == "unix" and os.path.exists(host):
+            os.unlink(host)
+
+
+def main():
+    """Main function for the synthesis daemon."""
+    parser = argparse.ArgumentParser(prog="kokoro-mv-serve",
+                                     description="Keep the Kokoro model loaded and serve synthesis requests.")
+    parser.add_argument("--address", default=os.getenv("KOKORO_MV_SERVER", DEFAULT_ADDRESS),
+                        help=f"http://host:port or unix:///path/to.sock (default: {DEFAULT_ADDRESS})")
+    parser.add_argument("--model-path", default="", help="Path to kokoro-v1.0.onnx")
+    parser.add_argument("--voices-path", default="", help="Path to voices-v1.0.bin")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent synthesis requests")
+    args = parser.parse_args()
+
+    try:
+        serve(args.address, args.model_path, args.voices_path, args.workers)
+    except KeyboardInterrupt:
+        print(f"\n\n⏹️  Server stopped.")
+    except Exception as e:
+        print(f"\n❌ Server failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Setup utilities for Kokoro Manim Voiceover
 Handles model file downloads and installation prompts.
 """
 
+import argparse
 import os
 import sys
 import urllib.request
@@ -11,12 +12,19 @@ from pathlib import Path
 from typing import Tuple, Optional
 
 
-def get_model_info() -> Tuple[str, str, str, str]:
+# Model precisions: fp32 is the reference model, fp16 and int8 are smaller and faster variants
+PRECISIONS = ("fp32", "fp16", "int8")
+RELEASE_URL = "https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0"
+
+
+def get_model_info(precision: str = "fp32") -> Tuple[str, str, str, str]:
     """Get model file information."""
-    model_url = "https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/kokoro-v1.0.onnx"
-    voices_url = "https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files-v1.0/voices-v1.0.bin"
-    model_file = "kokoro-v1.0.onnx"
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision {precision!r}, expected one of {list(PRECISIONS)}")
+    model_file = "kokoro-v1.0.onnx" if precision == "fp32" else f"kokoro-v1.0.{precision}.onnx"
     voices_file = "voices-v1.0.bin"
+    model_url = f"{RELEASE_URL}/{model_file}"
+    voices_url = f"{RELEASE_URL}/{voices_file}"
     return model_url, voices_url, model_file, voices_file
 
 
@@ -43,7 +51,14 @@ def download_file_with_progress(url: str, filename: str) -> bool:
                       end="", flush=True)
         
         print(f"📥 Starting download of {filename}...")
-        urllib.request.urlretrieve(url, filename, show_progress)
+        # Download next to the target and move it into place, so a partial file is never loaded
+        partial = f"{filename}.{os.getpid()}.part"
+        try:
+            urllib.request.urlretrieve(url, partial, show_progress)
+            os.replace(partial, filename)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
         print(f"\n✅ Successfully downloaded: {filename}")
         return True
     except Exception as e:
@@ -51,25 +66,60 @@ def download_file_with_progress(url: str, filename: str) -> bool:
         return False
 
 
-def check_model_files() -> Tuple[bool, bool]:
+def ensure_model_files(precision: str = "fp32", model_path: str = "", voices_path: str = "") -> Tuple[str, str]:
+    """
+    Paths of the model and voices files, downloaded first if missing; empty
+    paths default to the release file names in the working directory.
+    """
+    model_url, voices_url, model_file, voices_file = get_model_info(precision)
+    model_path, voices_path = model_path or model_file, voices_path or voices_file
+    for url, filename in ((model_url, model_path), (voices_url, voices_path)):
+        if not Path(filename).exists() and not download_file_with_progress(url, filename):
+            raise RuntimeError(f"{filename} is missing and could not be downloaded")
+    return model_path, voices_path
+
+
+def check_model_files(precision: str = "fp32") -> Tuple[bool, bool]:
     """Check if model files exist."""
-    _, _, model_file, voices_file = get_model_info()
+    _, _, model_file, voices_file = get_model_info(precision)
     model_exists = Path(model_file).exists()
     voices_exists = Path(voices_file).exists()
     return model_exists, voices_exists
 
 
-def prompt_model_download() -> None:
+def optimize_model_file(precision: str = "fp32") -> bool:
+    """Serialize the model optimized for this machine, so renders skip graph optimization on load."""
+    _, _, model_file, _ = get_model_info(precision)
+    if not Path(model_file).exists():
+        return False
+    try:
+        from .optimize import artifact_path, optimize_model
+
+        if artifact_path(model_file).exists():
+            print("✅ Optimized model is up to date.")
+            return True
+        print("⚙️  Optimizing the model for this machine...")
+        target = optimize_model(model_file)
+        print(f"✅ Saved optimized model: {target.name}")
+        return True
+    except Exception as e:
+        print(f"⚠️  Could not optimize the model: {e}")
+        print(f"   Kokoro will still work, optimizing the graph each time it loads.")
+        return False
+
+
+def prompt_model_download(precision: str = "fp32") -> None:
     """Prompt user to download model files during installation."""
     print("\n" + "="*60)
     print("🎤 Kokoro Manim Voiceover - Model Files Setup")
     print("="*60)
     
-    model_url, voices_url, model_file, voices_file = get_model_info()
-    model_exists, voices_exists = check_model_files()
+    model_url, voices_url, model_file, voices_file = get_model_info(precision)
+    model_exists, voices_exists = check_model_files(precision)
     
     if model_exists and voices_exists:
         print("✅ All model files are already present!")
+        optimize_model_file(precision)
         print("🚀 You're ready to use Kokoro Manim Voiceover!")
         return
     
@@ -112,6 +162,7 @@ def prompt_model_download() -> None:
     
     if success:
         print(f"\n🎉 All model files downloaded successfully!")
+        optimize_model_file(precision)
         print(f"🚀 Kokoro Manim Voiceover is ready to use!")
     else:
         print(f"\n⚠️  Some downloads failed. You can try again later or download manually.")
@@ -120,8 +171,13 @@ def prompt_model_download() -> None:
 
 def main():
     """Main function for the setup script."""
+    parser = argparse.ArgumentParser(prog="kokoro-mv-setup", description="Download and prepare the Kokoro model files.")
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32",
+                        help="Model variant: fp32 (reference), fp16 or int8 (smaller and faster on CPU)")
+    args = parser.parse_args()
+
     try:
-        prompt_model_download()
+        prompt_model_download(args.precision)
     except KeyboardInterrupt:
         print(f"\n\n⏹️  Setup interrupted by user.")
         sys.exit(1)
@@ -0,0 +1,127 @@
+"""
+Machine-wide audio store for Kokoro Manim Voiceover
+A content-addressed store, shared by every project of the user, that project
+caches link synthesized voiceovers from instead of re-synthesizing them.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .backends import CacheBackend
+from .paths import user_cache_dir
+
+
+def _temp_name(path: Path) -> Path:
+    return path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Copy-on-write clone src to dst (Linux FICLONE). Returns False where unsupported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    FICLONE = 0x40049409
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.unlink(dst)
+        return False
+
+
+def link_file(src: str, dst: str) -> None:
+    """
+    Atomically place src at dst without copying data where possible:
+    a hardlink, then a reflink, and a plain copy as the last resort.
+    """
+    dst = Path(dst)
+    tmp = _temp_name(dst)
+    try:
+        try:
+            os.link(src, tmp)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+                raise
+            if not _reflink(src, str(tmp)):
+                shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AudioStore(CacheBackend):
+    """
+    Content-addressed audio shared across projects. Also usable as a
+    filesystem cache backend on a shared mount, via the `root` argument.
+
+    `objects/` holds audio files named by the SHA-256 of their content, and
+    `refs/` maps a voiceover's input data hash to its object and cache entry.
+    Every file is written to a unique temporary name and renamed into place,
+    so concurrent processes never observe partial files.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root else user_cache_dir() / "store"
+        self.objects = self.root / "objects"
+        self.refs = self.root / "refs"
+
+    def _ref_path(self, data_hash: str) -> Path:
+        return self.refs / data_hash[:2] / (data_hash + ".json")
+
+    def get(self, data_hash: str) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        """Return (object path, cache entry) for a voiceover hash, or None on a miss."""
+        try:
+            with open(self._ref_path(data_hash), "r") as f:
+                ref = json.load(f)
+            obj, entry = self.objects / ref["object"], ref["entry"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable or damaged refs count as a miss; the voiceover is synthesized again
+            return None
+        if not obj.is_file() or not isinstance(entry, dict):
+            return None
+        return obj, entry
+
+    def put(self, data_hash: str, audio_file: str, entry: Dict[str, Any]) -> None:
+        """Add a synthesized voiceover to the store."""
+        digest = _file_digest(audio_file)
+        obj_name = f"{digest[:2]}/{digest}{Path(audio_file).suffix}"
+        obj = self.objects / obj_name
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            link_file(audio_file, str(obj))
+
+        ref_path = self._ref_path(data_hash)
+        ref_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _temp_name(ref_path)
+        with open(tmp, "w") as f:
+            json.dump({"object": obj_name, "entry": entry}, f)
+        os.replace(tmp, ref_path)
+
+    def fetch(self, data_hash: str, dest: str) -> Optional[Dict[str, Any]]:
+        """Link a stored voiceover to dest and return its cache entry, or None on a miss."""
+        hit = self.get(data_hash)
+        if hit is None:
+            return None
+        obj, entry = hit
+        link_file(str(obj), dest)
+        return entry
@@ -0,0 +1,131 @@
+"""
+Word timing for Kokoro Manim Voiceover
+Turns the phoneme durations Kokoro predicts into the word boundaries that
+manim_voiceover's bookmarks and tracker use, so they need no transcription pass.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# Units of a word boundary's audio_offset (manim_voiceover.tracker.AUDIO_OFFSET_RESOLUTION)
+AUDIO_OFFSET_RESOLUTION = 10_000_000
+
+# A word: one CJK character, or a run of letters and digits with inner apostrophes and hyphens
+_WORD = re.compile(r"[\u3040-\u30ff\u3400-\u9fff]|[^\W_](?:[\w'’-]*[^\W_])?")
+# Phonemes that are punctuation, not speech
+_PUNCTUATION = set(';:,.!?¡¿—…"«»“”()')
+
+
+class Word(NamedTuple):
+    """A spoken word: its offset in the narration text and its span of audio in samples."""
+    offset: int
+    text: str
+    start: int
+    end: int
+
+
+def _phoneme_words(timings) -> List[tuple]:
+    """(phoneme count, start, end) of every space-separated group of spoken phonemes."""
+    groups, current = [], []
+    for timing in list(timings) + [None]:
+        if timing is None or timing.phoneme == " ":
+            if current:
+                groups.append((len(current), current[0].start, current[-1].end))
+            current = []
+        elif timing.phoneme not in _PUNCTUATION:
+            current.append(timing)
+    return groups
+
+
+def _locate(groups: List[tuple], fraction: float) -> float:
+    """Time at a fraction of the way through the spoken phonemes."""
+    target = fraction * sum(count for count, _, _ in groups)
+    for count, start, end in groups:
+        if target <= count:
+            return start + (end - start) * target / count
+        target -= count
+    return groups[-1][2]
+
+
+def chunk_words(text: str, timings, length: int, sample_rate: int) -> List[Word]:
+    """
+    Word timings of a synthesized piece of text.
+
+    With phoneme timings (kokoro_onnx `Timing`s, in seconds) whose word count
+    matches the text, every word gets the span of its phonemes. Otherwise words
+    are placed in proportion to their length, across the spoken phonemes or,
+    without timings, across the whole audio.
+
+    Parameters:
+        text (str): The text that was synthesized.
+        timings (list): Phoneme timings from the model, or None.
+        length (int): Length of the audio in samples.
+        sample_rate (int): Sample rate of the audio.
+    """
+    words = [(m.start(), m.group()) for m in _WORD.finditer(text)]
+    if not words:
+        return []
+    groups = _phoneme_words(timings or [])
+    if len(groups) == len(words):
+        spans = [(start, end) for _, start, end in groups]
+    else:
+        groups = groups or [(1, 0.0, length / sample_rate)]
+        total = sum(len(word) for _, word in words)
+        spans, done = [], 0
+        for _, word in words:
+            spans.append((_locate(groups, done / total), _locate(groups, (done + len(word)) / total)))
+            done += len(word)
+    return [
+        Word(offset, word, min(length, round(start * sample_rate)), min(length, round(end * sample_rate)))
+        for (offset, word), (start, end) in zip(words, spans)
+    ]
+
+
+def locate(text: str, pieces: Sequence[str]) -> List[int]:
+    """Offsets of consecutive pieces of a text (e.g. its sentences) in that text."""
+    offsets, cursor = [], 0
+    for piece in pieces:
+        found = text.find(piece, cursor)
+        offset = found if found >= 0 else cursor
+        offsets.append(offset)
+        cursor = offset + len(piece) if found >= 0 else cursor
+    return offsets
+
+
+def shift(words: Sequence[Word], offset: int, start: int) -> List[Word]:
+    """Words of a piece placed at a text offset and sample position of the whole."""
+    return [Word(w.offset + offset, w.text, w.start + start, w.end + start) for w in words]
+
+
+def join_words(text: str, pieces: Sequence[str], piece_words: Sequence[Sequence[Word]],
+               starts: Sequence[int]) -> List[Word]:
+    """Words of consecutive pieces of a text, given where each piece starts in the joined audio."""
+    words = []
+    for offset, words_of_piece, start in zip(locate(text, pieces), piece_words, starts):
+        words.extend(shift(words_of_piece, offset, start))
+    return words
+
+
+def word_boundaries(words: Sequence[Word], sample_rate: int, start: int = 0,
+                    length: Optional[int] = None) -> List[Dict]:
+    """
+    Word boundaries in manim_voiceover's format, for audio that begins `start`
+    samples into the synthesized audio (after trimming) and is `length` long.
+    """
+    boundaries = []
+    for word in words:
+        begin, end = word.start - start, word.end - start
+        if length is not None:
+            if begin >= length:
+                continue
+            end = min(end, length)
+        begin = max(begin, 0)
+        boundaries.append({
+            "audio_offset": begin * AUDIO_OFFSET_RESOLUTION // sample_rate,
+            "duration_milliseconds": max(0, end - begin) * 1000 // sample_rate,
+            "text_offset": word.offset,
+            "word_length": len(word.text),
+            "text": word.text,
+            "boundary_type": "Word",
+        })
+    return boundaries
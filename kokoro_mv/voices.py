@@ -0,0 +1,126 @@
+"""
+Voice store for Kokoro Manim Voiceover
+Memory-maps the voice pack and materializes only the voices a process uses, so
+parallel renders don't each hold every style embedding of the catalogue.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import uuid
+import zipfile
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from .paths import user_cache_dir
+
+# Size of a zip local file header before its name and extra field
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+
+
+def _member_offset(path: str, info: zipfile.ZipInfo) -> int:
+    """File offset of a stored zip member's data."""
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        header = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+        name_length, extra_length = header[-2], header[-1]
+        return info.header_offset + _LOCAL_HEADER.size + name_length + extra_length
+
+
+def _map_stored(path: str, offset: int) -> np.ndarray:
+    """Memory-map the .npy array stored uncompressed at an offset of a file."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape,
+                     order="F" if fortran_order else "C", offset=data_offset)
+
+
+class VoiceStore(Mapping):
+    """
+    Read-only mapping of voice name to style embeddings, loaded on first access.
+
+    Voices stored uncompressed in the pack (an .npz file) are memory-mapped
+    in place. Compressed ones are extracted once into the user cache directory
+    and memory-mapped from there. Either way, only the pages of the style rows
+    Kokoro actually reads become resident.
+    """
+
+    def __init__(self, voices_path: str, cache_dir: Optional[str] = None):
+        self.voices_path = os.path.realpath(voices_path)
+        stat = os.stat(self.voices_path)
+        fingerprint = f"{self.voices_path}\n{stat.st_size}\n{stat.st_mtime_ns}"
+        key = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+        self.cache_dir = Path(cache_dir) if cache_dir else user_cache_dir() / "voices" / key
+        with zipfile.ZipFile(self.voices_path) as pack:
+            self._members: Dict[str, zipfile.ZipInfo] = {
+                info.filename[:-len(".npy")]: info for info in pack.infolist() if info.filename.endswith(".npy")
+            }
+        self._loaded: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _extract(self, name: str, info: zipfile.ZipInfo) -> Path:
+        target = self.cache_dir / (name + ".npy")
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                with zipfile.ZipFile(self.voices_path) as pack, pack.open(info) as src, open(tmp, "wb") as dst:
+                    for block in iter(lambda: src.read(1 << 20), b""):
+                        dst.write(block)
+                os.replace(tmp, target)
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+        return target
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        voice = self._loaded.get(name)
+        if voice is not None:
+            return voice
+        info = self._members.get(name)
+        if info is None:
+            raise KeyError(name)
+        with self._lock:
+            voice = self._loaded.get(name)
+            if voice is None:
+                if info.compress_type == zipfile.ZIP_STORED:
+                    voice = _map_stored(self.voices_path, _member_offset(self.voices_path, info))
+                else:
+                    voice = np.load(self._extract(name, info), mmap_mode="r")
+                self._loaded[name] = voice
+        return voice
+
+    def __contains__(self, name) -> bool:
+        return name in self._members
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def loaded(self) -> list:
+        """Names of the voices mapped so far."""
+        return sorted(self._loaded)
+
+
+def install_voice_store(kokoro, voices_path: str) -> None:
+    """
+    Replace a loaded model's voice pack with a VoiceStore. Packs that are not
+    .npz archives (e.g. older JSON voice files) are left as they are.
+    """
+    if not zipfile.is_zipfile(voices_path):
+        return
+    previous, kokoro.voices = kokoro.voices, VoiceStore(voices_path)
+    if hasattr(previous, "close"):
+        previous.close()
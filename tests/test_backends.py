@@ -0,0 +1,92 @@
+"""Tests for the HTTP cache backend, against an in-process http.server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from kokoro_mv.backends import HTTPBackend
+
+DATA_HASH = "ab" * 32
+
+
+class _StoreHandler(BaseHTTPRequestHandler):
+    """Serves PUT and GET against the server's `files` dict, keyed by path."""
+
+    def do_PUT(self):
+        self.server.files[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        body = self.server.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        # Announce more than is sent for the paths the test marks as truncated
+        self.send_header("Content-Length", str(len(body) + (100 if self.path in self.server.truncated else 0)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StoreHandler)
+    httpd.files, httpd.truncated = {}, set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def backend(server):
+    return HTTPBackend(f"http://127.0.0.1:{server.server_address[1]}/cache", timeout=5)
+
+
+def test_put_then_fetch_round_trip(server, backend, tmp_path):
+    audio = tmp_path / "voiceover.mp3"
+    audio.write_bytes(b"ID3" + bytes(range(256)) * 8)
+    entry = {"input_text": "Hello there.", "original_audio": "voiceover.mp3", "word_boundaries": []}
+
+    backend.put(DATA_HASH, str(audio), entry)
+    assert set(server.files) == {f"/cache/{DATA_HASH}.mp3", f"/cache/{DATA_HASH}.json"}
+
+    dest = tmp_path / "fetched.mp3"
+    assert backend.fetch(DATA_HASH, str(dest)) == entry
+    assert dest.read_bytes() == audio.read_bytes()
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
+
+
+def test_fetch_miss_returns_none(backend, tmp_path):
+    dest = tmp_path / "fetched.mp3"
+    assert backend.fetch(DATA_HASH, str(dest)) is None
+    assert not dest.exists()
+
+
+@pytest.mark.parametrize("body", [b"not json", b"\xff\xfe", b"[1, 2]", b'{"input_text": "no audio"}'])
+def test_fetch_malformed_entry_raises_oserror(server, backend, tmp_path, body):
+    server.files[f"/cache/{DATA_HASH}.json"] = body
+    dest = tmp_path / "fetched.mp3"
+    with pytest.raises(OSError):
+        backend.fetch(DATA_HASH, str(dest))
+    assert not dest.exists()
+
+
+def test_fetch_truncated_audio_raises_oserror(server, backend, tmp_path):
+    server.files[f"/cache/{DATA_HASH}.json"] = json.dumps({"original_audio": "voiceover.mp3"}).encode("utf-8")
+    server.files[f"/cache/{DATA_HASH}.mp3"] = b"ID3" + bytes(64)
+    server.truncated.add(f"/cache/{DATA_HASH}.mp3")
+    dest = tmp_path / "fetched.mp3"
+    with pytest.raises(OSError):
+        backend.fetch(DATA_HASH, str(dest))
+    assert not dest.exists()
+    assert list(tmp_path.iterdir()) == []